@@ -0,0 +1,258 @@
+"""
+活度系数模型计算非理想物系的相平衡
+由活度系数模型(van Laar, Wilson, NRTL)与两组分的Antoine常数计算恒压下的x-y平衡线,
+泡点温度与平衡线反函数均用向量化的牛顿法求解, 一次可计算任意多个点。
+模型对象提供与equilibrium_model中的平衡模型相同的equilibrium_line与equilibrium_line_inverse方法,
+也可以用tabulate生成相平衡数据交给原有的非理想物系计算类。
+
+Antoine方程: log10(p_sat) = A - B / (T + C), 压力与温度的单位由Antoine常数决定,
+pressure须与p_sat单位相同, 例如常用的 mmHg 与 ℃ 对应 pressure = 760。
+"""
+import numpy as np
+
+import full_reflux
+import partial_reflux
+
+class ActivityModel:
+    def __init__(self, antoine_1, antoine_2, pressure):
+        """
+        活度系数模型的基类, 子类实现activity_coefficient
+
+        Args:
+            antoine_1(tuple): 轻组分的Antoine常数(A, B, C)
+            antoine_2(tuple): 重组分的Antoine常数(A, B, C)
+            pressure(float): 操作压力
+        """
+        self.antoine = np.array([antoine_1, antoine_2], dtype=float)
+        self.pressure = pressure
+        # 纯组分沸点, 作为泡点温度的初值
+        A, B, C = self.antoine.T
+        self.boiling_point = B / (A - np.log10(pressure)) - C
+
+    def activity_coefficient(self, x):
+        """活度系数
+
+        Args:
+            x(ndarray): 轻组分液相组成
+
+        Returns:
+            tuple: (γ1, γ2)
+        """
+        raise NotImplementedError
+
+    def saturation_pressure(self, T):
+        """两组分的饱和蒸气压
+
+        Args:
+            T(ndarray): 温度
+
+        Returns:
+            tuple: (p1_sat, p2_sat)
+        """
+        A, B, C = self.antoine.T
+        return 10 ** (A[0] - B[0] / (T + C[0])), 10 ** (A[1] - B[1] / (T + C[1]))
+
+    def bubble_temperature(self, x, tolerance=1e-10, iteration=50):
+        """牛顿法计算泡点温度
+
+        求解 ln(x1 γ1 p1_sat + x2 γ2 p2_sat) = ln(pressure)
+
+        Args:
+            x(ndarray): 轻组分液相组成
+            tolerance(float): 温度的收敛精度
+            iteration(int): 最大迭代次数
+
+        Returns:
+            ndarray: 泡点温度
+        """
+        x = np.asarray(x, dtype=float)
+        gamma_1, gamma_2 = self.activity_coefficient(x)
+        A, B, C = self.antoine.T
+        T = x * self.boiling_point[0] + (1 - x) * self.boiling_point[1]
+        for _ in range(iteration):
+            p1, p2 = self.saturation_pressure(T)
+            part_1 = x * gamma_1 * p1
+            part_2 = (1 - x) * gamma_2 * p2
+            total = part_1 + part_2
+            # d(ln p_sat)/dT = ln(10) B / (T + C)^2
+            derivative = np.log(10) * (part_1 * B[0] / (T + C[0]) ** 2 +
+                                       part_2 * B[1] / (T + C[1]) ** 2) / total
+            step = (np.log(total) - np.log(self.pressure)) / derivative
+            T = T - step
+            if np.all(np.abs(step) < tolerance):
+                break
+        return T
+
+    def equilibrium_line(self, x):
+        """平衡线, 从x计算y
+
+        Args:
+            x(ndarray or float): 液相平衡组成
+
+        Returns:
+            ndarray: 汽相平衡组成
+        """
+        x = np.asarray(x, dtype=float)
+        gamma_1, _ = self.activity_coefficient(x)
+        p1, _ = self.saturation_pressure(self.bubble_temperature(x))
+        y = x * gamma_1 * p1 / self.pressure
+        return y
+
+    def equilibrium_line_inverse(self, y, tolerance=1e-12, iteration=50):
+        """平衡线, 从y计算x
+
+        牛顿法求解 equilibrium_line(x) = y, 导数用中心差分近似,
+        牛顿步越出当前有根区间时改为二分, 要求y(x)单调递增。
+
+        Args:
+            y(ndarray or float): 汽相平衡组成
+            tolerance(float): x的收敛精度
+            iteration(int): 最大迭代次数
+
+        Returns:
+            ndarray: 液相平衡组成
+        """
+        y = np.asarray(y, dtype=float)
+        x_low = np.zeros(y.shape)
+        x_high = np.ones(y.shape)
+        x = y.copy()
+        h = 1e-7
+        for _ in range(iteration):
+            residual = self.equilibrium_line(x) - y
+            x_low = np.where(residual < 0, x, x_low)
+            x_high = np.where(residual > 0, x, x_high)
+            derivative = (self.equilibrium_line(np.minimum(x + h, 1)) -
+                          self.equilibrium_line(np.maximum(x - h, 0))) / (np.minimum(x + h, 1) - np.maximum(x - h, 0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_new = x - residual / derivative
+            outside = ~((x_new > x_low) & (x_new < x_high))
+            x_new = np.where(outside, (x_low + x_high) / 2, x_new)
+            converged = np.all(np.abs(x_new - x) < tolerance)
+            x = x_new
+            if converged:
+                break
+        return x
+
+    def tabulate(self, size=101):
+        """生成相平衡数据
+
+        Args:
+            size(int): 数据点数
+
+        Returns:
+            tuple: (equilibrium_x, equilibrium_y)
+        """
+        equilibrium_x = np.linspace(0, 1, size)
+        equilibrium_y = self.equilibrium_line(equilibrium_x)
+        equilibrium_y[[0, -1]] = 0, 1
+        return equilibrium_x, equilibrium_y
+
+
+class VanLaar(ActivityModel):
+    def __init__(self, A12, A21, antoine_1, antoine_2, pressure):
+        """
+        van Laar模型
+
+        Args:
+            A12(float): van Laar参数A12
+            A21(float): van Laar参数A21
+            antoine_1(tuple): 轻组分的Antoine常数(A, B, C)
+            antoine_2(tuple): 重组分的Antoine常数(A, B, C)
+            pressure(float): 操作压力
+        """
+        self.A12 = A12
+        self.A21 = A21
+        super().__init__(antoine_1, antoine_2, pressure)
+
+    def activity_coefficient(self, x):
+        x_2 = 1 - x
+        denominator = self.A12 * x + self.A21 * x_2
+        ln_gamma_1 = self.A12 * (self.A21 * x_2 / denominator) ** 2
+        ln_gamma_2 = self.A21 * (self.A12 * x / denominator) ** 2
+        return np.exp(ln_gamma_1), np.exp(ln_gamma_2)
+
+
+class Wilson(ActivityModel):
+    def __init__(self, lambda_12, lambda_21, antoine_1, antoine_2, pressure):
+        """
+        Wilson模型
+
+        Args:
+            lambda_12(float): Wilson参数Λ12
+            lambda_21(float): Wilson参数Λ21
+            antoine_1(tuple): 轻组分的Antoine常数(A, B, C)
+            antoine_2(tuple): 重组分的Antoine常数(A, B, C)
+            pressure(float): 操作压力
+        """
+        self.lambda_12 = lambda_12
+        self.lambda_21 = lambda_21
+        super().__init__(antoine_1, antoine_2, pressure)
+
+    def activity_coefficient(self, x):
+        x_2 = 1 - x
+        sum_1 = x + self.lambda_12 * x_2
+        sum_2 = x_2 + self.lambda_21 * x
+        difference = self.lambda_12 / sum_1 - self.lambda_21 / sum_2
+        ln_gamma_1 = -np.log(sum_1) + x_2 * difference
+        ln_gamma_2 = -np.log(sum_2) - x * difference
+        return np.exp(ln_gamma_1), np.exp(ln_gamma_2)
+
+
+class NRTL(ActivityModel):
+    def __init__(self, tau_12, tau_21, alpha, antoine_1, antoine_2, pressure):
+        """
+        NRTL模型
+
+        Args:
+            tau_12(float): NRTL参数τ12
+            tau_21(float): NRTL参数τ21
+            alpha(float): 非随机参数α
+            antoine_1(tuple): 轻组分的Antoine常数(A, B, C)
+            antoine_2(tuple): 重组分的Antoine常数(A, B, C)
+            pressure(float): 操作压力
+        """
+        self.tau_12 = tau_12
+        self.tau_21 = tau_21
+        self.alpha = alpha
+        super().__init__(antoine_1, antoine_2, pressure)
+
+    def activity_coefficient(self, x):
+        x_2 = 1 - x
+        G_12 = np.exp(-self.alpha * self.tau_12)
+        G_21 = np.exp(-self.alpha * self.tau_21)
+        sum_1 = x + x_2 * G_21
+        sum_2 = x_2 + x * G_12
+        ln_gamma_1 = x_2 ** 2 * (self.tau_21 * (G_21 / sum_1) ** 2 + self.tau_12 * G_12 / sum_2 ** 2)
+        ln_gamma_2 = x ** 2 * (self.tau_12 * (G_12 / sum_2) ** 2 + self.tau_21 * G_21 / sum_1 ** 2)
+        return np.exp(ln_gamma_1), np.exp(ln_gamma_2)
+
+
+class FullRefluxActivity(full_reflux.FullReflux):
+    def __init__(self, model, x_D, x_W):
+        """
+        用活度系数模型计算全回流理论塔板
+
+        Args:
+            model(ActivityModel): 活度系数模型
+            x_D(float): 轻组分塔顶摩尔分数
+            x_W(float): 轻组分塔底摩尔分数
+        """
+        super().__init__(None, x_D, x_W)
+        self.model = model
+
+
+class PartialRefluxActivity(partial_reflux.PartialReflux):
+    def __init__(self, model, q, ratio, z_F, x_D, x_W):
+        """
+        用活度系数模型计算部分回流理论塔板
+
+        Args:
+            model(ActivityModel): 活度系数模型
+            q(float): 进料热状态
+            ratio(float): 实际回流比
+            z_F(float): 轻组分进料摩尔分数
+            x_D(float): 轻组分塔顶摩尔分数
+            x_W(float): 轻组分塔底摩尔分数
+        """
+        super().__init__(None, q, ratio, z_F, x_D, x_W)
+        self.model = model
@@ -0,0 +1,207 @@
+"""
+无界面批量计算入口
+从CSV或JSONL文件逐行读取工况并计算理论塔板, 结果逐行写出到标准输出或文件,
+不导入PySide6, 不打开任何窗口, 可在无显示器的计算节点上运行。
+
+用法:
+    python batch_runner.py cases.csv
+    python batch_runner.py cases.jsonl -o result.csv
+    python batch_runner.py cases.csv -e 相平衡数据示例/乙醇-水相平衡数据.csv
+    python batch_runner.py cases.csv --figure-dir figures --figure-format svg
+    python batch_runner.py cases.csv -e 相平衡数据.csv --fit-alpha 0.005
+    python batch_runner.py cases.csv --timings --profile batch.prof
+
+工况字段: alpha, q, ratio, z_F, x_D, x_W, 以及可选的mode(full或partial)。
+未给出mode时, 有ratio的工况按部分回流计算, 否则按全回流计算。
+给出相平衡数据文件(-e)时按非理想物系计算, 此时alpha无需给出。
+给出--timings时每个工况的结果附带各阶段耗时(秒), --profile把cProfile记录保存到文件。
+同时给出--fit-alpha时先由相平衡数据回归α, y的最大残差不超过给定值时改按理想物系计算。
+单个工况参数有误或计算出错时该工况的status为"error", error字段给出原因, 其余工况照常计算。
+"""
+import argparse
+import csv
+import cProfile
+import json
+import os
+import sys
+
+import numpy as np
+
+import full_reflux
+import full_reflux_non_ideal
+import partial_reflux
+import partial_reflux_non_ideal
+import profiling
+import vle_fit
+import vle_store
+
+FIELDS = ["alpha", "q", "ratio", "z_F", "x_D", "x_W"]
+RESULT_FIELDS = ["plate", "plate_for_loading", "status", "error"]
+TIMING_FIELDS = [f"time_{name}" for name in profiling.PHASE_NAMES]
+
+
+def read_cases(path):
+    """逐行读取工况
+
+    Args:
+        path(str): CSV或JSONL文件路径, 后缀为.jsonl或.json时按JSONL读取
+
+    Yields:
+        dict: 工况, 数值字段已转为float, 空值为None; 数值无法转换时该字段为None, 并在error中说明
+    """
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        if path.lower().endswith((".jsonl", ".json")):
+            rows = (json.loads(line) for line in file if line.strip())
+        else:
+            rows = csv.DictReader(file)
+        for row in rows:
+            case = dict(row)
+            for key in FIELDS:
+                value = case.get(key)
+                try:
+                    case[key] = None if value in (None, "") else float(value)
+                except (TypeError, ValueError):
+                    case[key] = None
+                    case["error"] = f"{key}={value!r} 不是数值"
+            yield case
+
+
+def create_process(case, equilibrium=None):
+    """根据工况建立计算对象
+
+    Args:
+        case(dict): 工况
+        equilibrium(tuple): (equilibrium_x, equilibrium_y), 为None时按理想物系计算
+
+    Returns:
+        FullReflux, FullRefluxNonIdeal, PartialReflux或PartialRefluxNonIdeal的实例
+    """
+    mode = case.get("mode") or ("partial" if case["ratio"] is not None else "full")
+    if mode == "partial":
+        if equilibrium is None:
+            return partial_reflux.PartialReflux(case["alpha"], case["q"], case["ratio"],
+                                                case["z_F"], case["x_D"], case["x_W"])
+        return partial_reflux_non_ideal.PartialRefluxNonIdeal(*equilibrium, case["q"], case["ratio"],
+                                                              case["z_F"], case["x_D"], case["x_W"])
+    if equilibrium is None:
+        return full_reflux.FullReflux(case["alpha"], case["x_D"], case["x_W"])
+    return full_reflux_non_ideal.FullRefluxNonIdeal(*equilibrium, case["x_D"], case["x_W"])
+
+
+def calculate_case(process, max_plate=10000, time_limit=None, store_trajectory=False, kremser_tolerance=None):
+    """计算单个工况
+
+    Args:
+        process: create_process建立的计算对象
+        max_plate(int): 允许的最大塔板数
+        time_limit(float): 每个工况允许的最长计算时间(秒)
+        store_trajectory(bool): 是否保存逐板轨迹, 只在需要作图时保存
+        kremser_tolerance(float): 解析跳步的塔板数容差, 为None时全部逐板计算
+
+    Returns:
+        dict: 计算结果, plate为None表示无法分离
+    """
+    if hasattr(process, "ratio"):
+        plate, plate_for_loading = process.calculate_theory_plate(max_plate, time_limit,
+                                                                  store_trajectory=store_trajectory,
+                                                                  kremser_tolerance=kremser_tolerance)
+    else:
+        plate = process.calculate_theory_plate(max_plate, time_limit, store_trajectory=store_trajectory,
+                                               kremser_tolerance=kremser_tolerance)
+        plate_for_loading = None
+
+    if np.isnan(plate):
+        return {"plate": None, "plate_for_loading": None, "status": process.status}
+    return {"plate": float(plate),
+            "plate_for_loading": None if plate_for_loading is None else int(plate_for_loading),
+            "status": process.status}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面批量计算精馏理论塔板")
+    parser.add_argument("cases", help="工况文件(CSV或JSONL)")
+    parser.add_argument("-o", "--output", help="结果文件, 后缀为.csv时写CSV, 否则写JSONL; 默认写到标准输出")
+    parser.add_argument("-e", "--equilibrium", help="非理想物系的相平衡数据文件(CSV或Excel)")
+    parser.add_argument("--max-plate", type=int, default=10000, help="允许的最大塔板数")
+    parser.add_argument("--time-limit", type=float, default=None, help="每个工况允许的最长计算时间(秒)")
+    parser.add_argument("--figure-dir", help="塔板图输出目录, 给出时为每个可分离的工况保存一张图")
+    parser.add_argument("--figure-format", default="png", help="塔板图格式(png, svg, pdf等)")
+    parser.add_argument("--fit-alpha", type=float, default=None, metavar="MAX_ERROR",
+                        help="由相平衡数据回归α, y的最大残差不超过MAX_ERROR时按理想物系计算")
+    parser.add_argument("--kremser-tolerance", type=float, default=None, metavar="TOLERANCE",
+                        help="理想物系提馏段用Smoker方程跳步, 塔板数误差不超过TOLERANCE; 非理想物系不起作用")
+    parser.add_argument("--timings", action="store_true", help="输出每个工况各阶段的耗时")
+    parser.add_argument("--profile", help="用cProfile记录全部工况并保存到该文件")
+    args = parser.parse_args(argv)
+
+    exporter = None
+    if args.figure_dir is not None:
+        import diagram_export
+        os.makedirs(args.figure_dir, exist_ok=True)
+        exporter = diagram_export.DiagramExporter()
+
+    profiler = cProfile.Profile() if args.profile is not None else False
+    setup_timer = profiling.PhaseTimer(profiler)
+    with setup_timer.phase("parse"):
+        equilibrium = None if args.equilibrium is None else vle_store.load(args.equilibrium)
+        fitted_alpha = None
+        if equilibrium is not None and args.fit_alpha is not None:
+            fitted_alpha, fit = vle_fit.choose_alpha(*equilibrium, args.fit_alpha)
+            print(f"回归α = {fit['parameters']['alpha']:.6g}, y最大残差 = {fit['max_error']:.3g}, "
+                  f"{'按理想物系计算' if fitted_alpha is not None else '仍按非理想物系计算'}", file=sys.stderr)
+            if fitted_alpha is not None:
+                equilibrium = None
+    if args.timings and equilibrium is not None:
+        print(f"读取相平衡数据与回归: {setup_timer.timings['parse']:.6f}s", file=sys.stderr)
+
+    output = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8", newline="")
+    writer = None
+    cases = read_cases(args.cases)
+    number = 0
+    try:
+        while True:
+            timer = profiling.PhaseTimer(profiler)
+            with timer.phase("parse"):
+                case = next(cases, None)
+            if case is None:
+                break
+            number += 1
+            if fitted_alpha is not None:
+                case["alpha"] = fitted_alpha
+            # 单个工况出错时记录错误并继续计算后面的工况, 不中断整批计算
+            try:
+                if "error" in case:
+                    raise ValueError(case["error"])
+                with timer.phase("build"):
+                    process = create_process(case, equilibrium)
+                with timer.phase("step"):
+                    row = {**case, **calculate_case(process, args.max_plate, args.time_limit, exporter is not None,
+                                                      args.kremser_tolerance)}
+            except Exception as error:
+                row = {**case, "plate": None, "plate_for_loading": None, "status": "error",
+                       "error": f"{type(error).__name__}: {error}"}
+            if exporter is not None and row["plate"] is not None:
+                with timer.phase("render"):
+                    exporter.render(process, os.path.join(args.figure_dir, f"case_{number}.{args.figure_format}"))
+            if args.output is not None and args.output.lower().endswith(".csv"):
+                if writer is None:
+                    fieldnames = ["mode"] + FIELDS + RESULT_FIELDS + (TIMING_FIELDS if args.timings else [])
+                    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction="ignore")
+                    writer.writeheader()
+                if args.timings:
+                    row.update({f"time_{name}": seconds for name, seconds in timer.timings.items()})
+                writer.writerow(row)
+            else:
+                if args.timings:
+                    row["timings"] = timer.to_dict()
+                output.write(json.dumps(row, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if args.profile is not None:
+            profiler.dump_stats(args.profile)
+
+
+if __name__ == "__main__":
+    main()
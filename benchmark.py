@@ -0,0 +1,371 @@
+"""
+逐板计算与作图的基准测试
+对四个计算类在不同工况(易分离、高纯度、接近最小回流比)下计时,
+并测量离屏绘制塔板图的时间。记录每秒计算的塔板数与峰值内存, 保存为JSON基准文件,
+之后与基准文件比较即可发现性能退化。
+各项交替计时多轮, 每项每轮计时前紧挨着对一个与本仓库代码无关的参考内核计时,
+比较时用各轮时间比的中位数, 以抵消不同机器或机器负载造成的整体快慢; 基准文件中另记录CPU等运行环境供参考。
+单次耗时不足0.1 ms的项目计时抖动较大, 允许的变慢比例加倍。
+每次运行还核对全回流Fenske解析解、部分回流批量计算与逐板计算的结果是否一致。
+
+用法:
+    python benchmark.py                                 # 运行并打印结果
+    python benchmark.py --save benchmark_baseline.json  # 运行并保存为基准
+    python benchmark.py --compare benchmark_baseline.json --threshold 0.3
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+import full_reflux
+import full_reflux_non_ideal
+import minimum_reflux
+import partial_reflux
+import partial_reflux_batch
+import partial_reflux_non_ideal
+import vle_store
+
+EQUILIBRIUM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "相平衡数据示例", "乙醇-水相平衡数据.csv")
+ALPHA = 2.5
+REFERENCE = "reference"
+SHORT_CASE_SECONDS = 1e-4
+
+
+def reference_kernel():
+    """参考内核: 纯Python浮点运算的全回流逐板计算加少量小数组NumPy运算, 与被测代码的运算类型相近
+
+    不调用本仓库的任何模块, 修改计算代码不会改变它的耗时。
+    """
+    alpha = ALPHA
+    for x_W in (0.05, 1e-3, 1e-5):
+        x = 0.99999
+        while x > x_W:
+            x = x / (x + alpha * (1 - x))
+    grid = np.linspace(0, 1, 64)
+    np.interp(grid * 0.5, grid, grid / (1 + grid))
+
+
+def _cpu_name():
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def _near_minimum_ratio(factor=1.05):
+    ideal = minimum_reflux.MinimumReflux(ALPHA, 1, 0.5, 0.95).calculate_minimum_reflux_ratio()[0]
+    equilibrium_x, equilibrium_y = vle_store.load(EQUILIBRIUM_PATH, use_cache=False)
+    non_ideal = minimum_reflux.MinimumRefluxNonIdeal(equilibrium_x, equilibrium_y, 1, 0.1,
+                                                     0.8).calculate_minimum_reflux_ratio()[0]
+    return factor * float(ideal), factor * float(non_ideal)
+
+
+def create_cases():
+    """建立基准测试的工况
+
+    Returns:
+        list: (名称, 建立计算对象的无参函数)的列表
+    """
+    equilibrium_x, equilibrium_y = vle_store.load(EQUILIBRIUM_PATH, use_cache=False)
+    ideal_ratio, non_ideal_ratio = _near_minimum_ratio()
+    return [
+        ("FullReflux/easy", lambda: full_reflux.FullReflux(ALPHA, 0.95, 0.05)),
+        ("FullReflux/high_purity", lambda: full_reflux.FullReflux(ALPHA, 0.99999, 1e-5)),
+        ("PartialReflux/easy", lambda: partial_reflux.PartialReflux(ALPHA, 1, 2, 0.5, 0.95, 0.05)),
+        ("PartialReflux/high_purity", lambda: partial_reflux.PartialReflux(ALPHA, 1, 2, 0.5, 0.99999, 1e-5)),
+        ("PartialReflux/near_minimum", lambda: partial_reflux.PartialReflux(ALPHA, 1, ideal_ratio,
+                                                                          0.5, 0.95, 0.05)),
+        ("FullRefluxNonIdeal/easy", lambda: full_reflux_non_ideal.FullRefluxNonIdeal(
+            equilibrium_x, equilibrium_y, 0.8, 0.02)),
+        ("FullRefluxNonIdeal/high_purity", lambda: full_reflux_non_ideal.FullRefluxNonIdeal(
+            equilibrium_x, equilibrium_y, 0.85, 1e-5)),
+        ("PartialRefluxNonIdeal/easy", lambda: partial_reflux_non_ideal.PartialRefluxNonIdeal(
+            equilibrium_x, equilibrium_y, 1, 3, 0.1, 0.8, 0.02)),
+        ("PartialRefluxNonIdeal/high_purity", lambda: partial_reflux_non_ideal.PartialRefluxNonIdeal(
+            equilibrium_x, equilibrium_y, 1, 3, 0.1, 0.85, 1e-5)),
+        ("PartialRefluxNonIdeal/near_minimum", lambda: partial_reflux_non_ideal.PartialRefluxNonIdeal(
+            equilibrium_x, equilibrium_y, 1, non_ideal_ratio, 0.1, 0.8, 0.02)),
+    ]
+
+
+def check_fenske(tolerance=1e-9):
+    """核对全回流Fenske解析解与逐板计算的塔板数, 解析解按标量与数组各算一次, 无法分离的工况两者均应为NaN
+
+    Args:
+        tolerance(float): 允许的塔板数之差
+
+    Returns:
+        list: 不一致的工况说明
+    """
+    cases = [(ALPHA, 0.95, 0.05), (ALPHA, 0.99999, 1e-5), (1.2, 0.9, 0.1), (10.0, 0.9, 0.1), (1.5, 0.99, 0.01),
+             (ALPHA, 0.99, 1e-12), (0.8, 0.95, 0.05), (ALPHA, 0.3, 0.6)]
+    alpha, x_D, x_W = (np.array(column) for column in zip(*cases))
+    array_plate = full_reflux.FullReflux(alpha, x_D, x_W).calculate_theory_plate_fenske()
+    mismatches = []
+    for case, fenske_array in zip(cases, array_plate):
+        process = full_reflux.FullReflux(*case)
+        stepped = process.calculate_theory_plate()
+        fenske = process.calculate_theory_plate_fenske()
+        if not all(abs(value - stepped) <= tolerance or np.isnan(value) and np.isnan(stepped)
+                   for value in (fenske, fenske_array)):
+            mismatches.append(f"FullReflux{case}: 逐板 {stepped:.9f}, Fenske {fenske:.9f}, "
+                              f"Fenske(数组) {fenske_array:.9f}")
+    return mismatches
+
+
+def check_batch(size=200, seed=0, tolerance=1e-9):
+    """核对部分回流批量计算与逐个工况逐板计算的塔板数与最佳进料板, 批量计算按整个数组与逐个标量各算一次
+
+    工况随机抽取, 回流比取最小回流比(不小于0.5)的1.2~3倍, 保证可以分离。
+
+    Args:
+        size(int): 工况数
+        seed(int): 随机数种子
+        tolerance(float): 允许的塔板数之差
+
+    Returns:
+        list: 不一致的工况说明
+    """
+    rng = np.random.default_rng(seed)
+    alpha = rng.uniform(1.2, 4, size)
+    q = rng.uniform(0.2, 1.5, size)
+    z_F = rng.uniform(0.3, 0.7, size)
+    x_D = rng.uniform(0.8, 0.9999, size)
+    x_W = 10 ** rng.uniform(-8, -1, size)
+    minimum_ratio = minimum_reflux.MinimumReflux(alpha, q, z_F, x_D).calculate_minimum_reflux_ratio()[0]
+    # 进料过冷、组成较高时最小回流比可能为负, 此时按0.5计
+    ratio = np.maximum(minimum_ratio, 0.5) * rng.uniform(1.2, 3, size)
+
+    array_plate, array_feed = partial_reflux_batch.PartialRefluxBatch(alpha, q, ratio, z_F, x_D,
+                                                                      x_W).calculate_theory_plate()
+    mismatches = []
+    for i, case in enumerate(zip(alpha, q, ratio, z_F, x_D, x_W)):
+        case = tuple(float(value) for value in case)
+        plate, feed = partial_reflux.PartialReflux(*case).calculate_theory_plate()
+        scalar_plate, scalar_feed = partial_reflux_batch.PartialRefluxBatch(*case).calculate_theory_plate()
+        if not all(abs(value - plate) <= tolerance and loading == feed
+                   for value, loading in ((array_plate[i], array_feed[i]), (scalar_plate, scalar_feed))):
+            mismatches.append(f"PartialReflux{case}: 逐板 {plate:.9f}/{feed}, 批量 {array_plate[i]:.9f}/{array_feed[i]}, "
+                              f"批量(标量) {scalar_plate:.9f}/{scalar_feed}")
+    return mismatches
+
+
+def _plate_count(result):
+    plate = result[0] if isinstance(result, tuple) else result
+    return float(plate)
+
+
+def _loop_count(timer, seconds=0.05):
+    """确定一次计时的循环次数, 使一次计时不少于seconds秒
+
+    Args:
+        timer(timeit.Timer): 计时器
+        seconds(float): 一次计时的最短时间
+
+    Returns:
+        int: 循环次数
+    """
+    number = 1
+    while timer.timeit(number) < seconds:
+        number *= 2
+    return number
+
+
+def _peak_memory(function):
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def prepare_case(factory):
+    """准备一个工况的计时: 计算一次记录结果, 并测量峰值内存
+
+    计时包括建立计算对象与逐板计算。
+
+    Args:
+        factory(callable): 建立计算对象的无参函数
+
+    Returns:
+        tuple: (被计时的无参函数, 结果dict: plate, peak_memory_bytes, status)
+    """
+    process = factory()
+    plate = _plate_count(process.calculate_theory_plate())
+
+    def function():
+        factory().calculate_theory_plate()
+
+    return function, {"plate": None if np.isnan(plate) else plate,
+                      "peak_memory_bytes": _peak_memory(function),
+                      "status": process.status}
+
+
+def prepare_rendering(factory):
+    """准备离屏绘制塔板图的计时, 计时只包括更新线条与保存图片
+
+    Args:
+        factory(callable): 建立计算对象的无参函数
+
+    Returns:
+        tuple: (被计时的无参函数, 结果dict: peak_memory_bytes)
+    """
+    import diagram_export
+
+    process = factory()
+    process.calculate_theory_plate()
+    exporter = diagram_export.DiagramExporter()
+
+    def function():
+        exporter.render(process, io.BytesIO())
+
+    function()
+    return function, {"peak_memory_bytes": _peak_memory(function)}
+
+
+def run(repeat=5):
+    """运行全部基准测试
+
+    各项交替计时repeat轮, 每项每轮计时前紧挨着对参考内核计时一次, 两者之比受机器快慢漂移的影响很小。
+    每项记录各轮单次时间的中位数seconds与各轮时间比的中位数relative。
+
+    Args:
+        repeat(int): 计时的轮数
+
+    Returns:
+        dict: environment为运行环境, results为各项结果, 其中REFERENCE项为参考内核
+    """
+    cases = create_cases()
+    prepared = [(name, *prepare_case(factory)) for name, factory in cases]
+    factories = dict(cases)
+    for name in ("PartialReflux/easy", "PartialReflux/high_purity", "PartialRefluxNonIdeal/easy"):
+        prepared.append((f"render/{name}", *prepare_rendering(factories[name])))
+
+    reference_timer = timeit.Timer(reference_kernel)
+    reference_number = _loop_count(reference_timer)
+    timers = [(name, timeit.Timer(function), result) for name, function, result in prepared]
+    numbers = [_loop_count(timer) for _, timer, _ in timers]
+    reference_seconds = []
+    seconds = {name: [] for name, _, _ in timers}
+    relative = {name: [] for name, _, _ in timers}
+    for _ in range(repeat):
+        for (name, timer, _), number in zip(timers, numbers):
+            reference_seconds.append(reference_timer.timeit(reference_number) / reference_number)
+            seconds[name].append(timer.timeit(number) / number)
+            relative[name].append(seconds[name][-1] / reference_seconds[-1])
+
+    results = {REFERENCE: {"seconds": float(np.median(reference_seconds))}}
+    for name, _, result in timers:
+        result["seconds"] = float(np.median(seconds[name]))
+        result["relative"] = float(np.median(relative[name]))
+        if "plate" in result:
+            result["stages_per_second"] = None if result["plate"] is None else result["plate"] / result["seconds"]
+        results[name] = result
+    return {"environment": {"python": platform.python_version(),
+                            "numpy": np.__version__,
+                            "platform": platform.platform(),
+                            "machine": platform.machine(),
+                            "cpu": _cpu_name(),
+                            "cpu_count": os.cpu_count()},
+            "results": results}
+
+
+def _format_plate(plate):
+    return "NaN" if plate is None else f"{plate:.6f}"
+
+
+def compare(current, baseline, threshold=0.3):
+    """与基准比较
+
+    比较各项与参考内核的时间比relative(各轮中位数); 基准文件没有relative时按参考内核的中位时间换算后比较。
+    基准时间不足SHORT_CASE_SECONDS的项目允许的变慢比例加倍。
+    塔板数改变、由可分离变为无法分离(或反之)以及status改变都视为退化。
+
+    Args:
+        current(dict): run的结果
+        baseline(dict): 基准文件的内容
+        threshold(float): 允许的相对变慢比例
+
+    Returns:
+        list: 性能退化或结果改变的项目说明
+    """
+    regressions = []
+    scale = 1.0
+    if REFERENCE in baseline["results"] and REFERENCE in current["results"]:
+        scale = current["results"][REFERENCE]["seconds"] / baseline["results"][REFERENCE]["seconds"]
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None or name == REFERENCE:
+            continue
+        allowed = threshold * 2 if base["seconds"] < SHORT_CASE_SECONDS else threshold
+        if "relative" in base and "relative" in result:
+            slower = result["relative"] > base["relative"] * (1 + allowed)
+            ratio = result["relative"] / base["relative"]
+        else:
+            slower = result["seconds"] > base["seconds"] * scale * (1 + allowed)
+            ratio = result["seconds"] / (base["seconds"] * scale)
+        if slower:
+            regressions.append(f"{name}: {base['seconds'] * 1e3:.3f} ms -> {result['seconds'] * 1e3:.3f} ms"
+                               f" (按参考内核换算 x{ratio:.2f})")
+        if "plate" in base:
+            plate_changed = (base["plate"] is None) != (result["plate"] is None) or (
+                base["plate"] is not None and abs(result["plate"] - base["plate"]) > 1e-6)
+            if plate_changed:
+                regressions.append(f"{name}: 塔板数 {_format_plate(base['plate'])} -> "
+                                   f"{_format_plate(result['plate'])}")
+        if "status" in base and result.get("status") != base["status"]:
+            regressions.append(f"{name}: status {base['status']} -> {result.get('status')}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="逐板计算与作图的基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="交替计时的轮数")
+    parser.add_argument("--save", help="把结果保存为基准文件")
+    parser.add_argument("--compare", help="与基准文件比较, 有退化时返回1")
+    parser.add_argument("--threshold", type=float, default=0.3, help="允许的相对变慢比例")
+    args = parser.parse_args(argv)
+
+    mismatches = check_fenske() + check_batch()
+    for line in mismatches:
+        print(f"不一致: {line}")
+
+    current = run(args.repeat)
+    for name, result in current["results"].items():
+        speed = result.get("stages_per_second")
+        memory = result.get("peak_memory_bytes")
+        print(f"{name:40s} {result['seconds'] * 1e3:10.3f} ms"
+              f"{'' if speed is None else f'{speed:14.0f} 板/秒'}"
+              f"{'' if memory is None else f'{memory / 1024:10.1f} KiB'}")
+
+    if args.save is not None:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(current, file, ensure_ascii=False, indent=2)
+            file.write("\n")
+
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline["environment"].get("cpu") != current["environment"]["cpu"]:
+            print(f"注意: 基准记录于 {baseline['environment'].get('cpu') or '未知CPU'}, "
+                  f"当前为 {current['environment']['cpu'] or '未知CPU'}, 时间已按参考内核换算")
+        regressions = compare(current, baseline, args.threshold)
+        for line in regressions:
+            print(f"退化: {line}")
+        return 1 if regressions or mismatches else 0
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+后台计算线程
+在QThreadPool的线程中运行计算对象的calculate_theory_plate, 通过信号报告进度与结果,
+主线程只负责显示, 计算耗时或无法结束时界面仍可操作。
+"""
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+class WorkerSignals(QObject):
+    """后台计算的信号
+
+    progress(int): 已算出的塔板数
+    finished(object): calculate_theory_plate的返回值
+    failed(str): 计算出错时的错误信息
+    """
+    progress = Signal(int)
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class CalculationWorker(QRunnable):
+    def __init__(self, process, progress_interval=50, timer=None):
+        """
+        在后台线程中计算理论塔板
+
+        Args:
+            process: FullReflux, FullRefluxNonIdeal, PartialReflux或PartialRefluxNonIdeal的实例
+            progress_interval(int): 每算出多少块板发出一次progress信号
+            timer(PhaseTimer): 分阶段计时器, 给出时把逐板计算计入step阶段
+        """
+        super().__init__()
+        self.process = process
+        self.timer = timer
+        self.progress_interval = progress_interval
+        self.cancelled = False
+        self.signals = WorkerSignals()
+
+    def cancel(self):
+        """请求停止计算, 计算对象会在下一块板前停止并返回无法分离的结果"""
+        self.cancelled = True
+
+    def callback(self, plate):
+        """calculate_theory_plate的回调, 报告进度并检查是否取消
+
+        Args:
+            plate(int): 已算出的塔板数
+
+        Returns:
+            bool: 是否继续计算
+        """
+        if plate % self.progress_interval == 0:
+            self.signals.progress.emit(plate)
+        return not self.cancelled
+
+    def run(self):
+        try:
+            if self.timer is None:
+                result = self.process.calculate_theory_plate(callback=self.callback)
+            else:
+                with self.timer.phase("step"):
+                    result = self.process.calculate_theory_plate(callback=self.callback)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
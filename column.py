@@ -0,0 +1,161 @@
+"""
+多股进料、侧线采出的精馏塔
+恒摩尔流假设下, 塔顶以回流比R与馏出液流量D确定最上一段的液、汽流量 L = RD, V = (R + 1)D,
+每经过一股流量为f、热状态为q的物流(进料f > 0, 侧线采出f < 0):
+    L' = L + q f,  V' = V - (1 - q) f
+各段操作线由该段以上的物料衡算得到
+    V y = L x + D x_D - Σ f z
+相邻两段操作线的交点即该物流的最佳位置(进料时为q线与操作线的交点, 液相侧线时为 x = 侧线组成)。
+所有交点在建立对象时算好, 按x递减排成stepping.Segment表, 逐板计算时二分查找所在塔段。
+
+D由全塔物料衡算 Σf z = D x_D + W x_W 与 Σf = D + W 求出, 因此最下一段操作线必过(x_W, x_W)。
+"""
+import collections
+
+import numpy as np
+
+import stepping
+
+Feed = collections.namedtuple("Feed", ["flow", "z", "q"])
+Feed.__doc__ = """进料: 流量, 轻组分摩尔分数, 进料热状态"""
+
+SideDraw = collections.namedtuple("SideDraw", ["flow", "composition", "q"], defaults=[1.0])
+SideDraw.__doc__ = """侧线采出: 流量, 轻组分摩尔分数, q=1为液相采出(组成为液相组成), q=0为汽相采出(组成为汽相组成)"""
+
+
+class Column:
+    def __init__(self, model, ratio, x_D, x_W, feeds, side_draws=()):
+        """
+        多股进料、侧线采出的精馏塔, 物流按组成从高到低自上而下排列
+
+        Args:
+            model: 平衡模型, 见equilibrium_model与activity_model
+            ratio(float): 实际回流比
+            x_D(float): 轻组分塔顶摩尔分数
+            x_W(float): 轻组分塔底摩尔分数
+            feeds(list): Feed的列表
+            side_draws(list): SideDraw的列表
+
+        Raises:
+            ValueError: 馏出液或釜液流量不为正、某段液汽流量不为正, 或物流位置的顺序与组成顺序不一致
+        """
+        self.model = model
+        self.ratio = ratio
+        self.x_D = x_D
+        self.x_W = x_W
+        self.feeds = [Feed(*feed) for feed in feeds]
+        self.side_draws = [SideDraw(*draw) for draw in side_draws]
+        # (有符号流量, 组成, q), 稳定排序保证组成相同时进料在前
+        streams = [(feed.flow, feed.z, feed.q) for feed in self.feeds]
+        streams += [(-draw.flow, draw.composition, draw.q) for draw in self.side_draws]
+        self.streams = sorted(streams, key=lambda stream: -stream[1])
+        self.calculate_operating_lines()
+
+    def equilibrium_line(self, x):
+        """平衡线, 从x计算y
+
+        Args:
+            x(ndarray or float): 液相平衡组成
+
+        Returns:
+            ndarray or float: 汽相平衡组成
+        """
+        return self.model.equilibrium_line(x)
+
+    def equilibrium_line_inverse(self, y):
+        """平衡线, 从y计算x
+
+        Args:
+            y(ndarray or float): 汽相平衡组成
+
+        Returns:
+            ndarray or float: 液相平衡组成
+        """
+        return self.model.equilibrium_line_inverse(y)
+
+    def calculate_operating_lines(self):
+        """由物料衡算计算各段流量与操作线, 以及相邻操作线的交点, 建立属性
+
+        属性D、W为馏出液与釜液流量, flows为各段(L, V), intersections为各物流处的交点(x, y),
+        segments为从塔顶到塔底排列的stepping.Segment, section为塔段序号(0为塔顶一段)。
+        """
+        total_flow = sum(flow for flow, _, _ in self.streams)
+        total_light = sum(flow * z for flow, z, _ in self.streams)
+        self.D = (total_light - self.x_W * total_flow) / (self.x_D - self.x_W)
+        self.W = total_flow - self.D
+        if not (self.D > 0 and self.W > 0):
+            raise ValueError(f"馏出液流量D={self.D:.6g}, 釜液流量W={self.W:.6g}, 须均为正, 请检查物流与塔顶、塔底组成")
+
+        L = self.ratio * self.D
+        V = (self.ratio + 1) * self.D
+        net = self.D * self.x_D
+        self.flows = [(L, V)]
+        lines = [(L / V, net / V)]
+        for flow, z, q in self.streams:
+            L += q * flow
+            V -= (1 - q) * flow
+            net -= flow * z
+            if not (L > 0 and V > 0):
+                raise ValueError(f"组成为{z:.6g}的物流以下液相流量L={L:.6g}, 汽相流量V={V:.6g}, 须均为正")
+            self.flows.append((L, V))
+            lines.append((L / V, net / V))
+
+        intersections = []
+        for (slope_above, intercept_above), (slope_below, intercept_below) in zip(lines, lines[1:]):
+            if slope_above == slope_below:
+                raise ValueError("相邻两段操作线平行, 没有唯一交点。")
+            x = (intercept_below - intercept_above) / (slope_above - slope_below)
+            intersections.append((x, slope_above * x + intercept_above))
+        self.intersections = np.array(intersections).reshape(-1, 2)
+
+        x_bounds = [self.x_D, *self.intersections[:, 0], self.x_W]
+        if not all(upper > lower for upper, lower in zip(x_bounds, x_bounds[1:])):
+            raise ValueError("各物流处操作线交点的x须在x_D与x_W之间并自上而下递减, 请检查物流组成与热状态")
+
+        self.segments = [stepping.Segment(x_low, slope, intercept, section)
+                         for section, (x_low, (slope, intercept))
+                         in enumerate(zip([*self.intersections[:, 0], -np.inf], lines))]
+
+    def operating_line(self, x):
+        """分段操作线
+
+        Args:
+            x(ndarray or float): 液相组成
+
+        Returns:
+            ndarray or float: 汽相组成
+        """
+        x = np.asarray(x, dtype=float)
+        x_low = np.array([segment.x_low for segment in self.segments])
+        slope = np.array([segment.slope for segment in self.segments])
+        intercept = np.array([segment.intercept for segment in self.segments])
+        # x_low递减, 第一个满足 x > x_low 的段即所在塔段
+        index = np.argmax(x[..., None] > x_low, axis=-1)
+        y = slope[index] * x + intercept[index]
+        return y[()]
+
+    def calculate_theory_plate(self, max_plate=10000, time_limit=None, tolerance=1e-12, callback=None,
+                               store_trajectory=True, kremser_tolerance=None):
+        """计算塔板以及各物流的最佳位置
+
+        逐板计算时若液相组成不再下降(恒浓区)、塔板数超过max_plate或耗时超过time_limit,
+        则停止计算, 并将status属性设为"pinched"、"max_plate"或"timeout", 正常结束时为"converged"。
+        x_D不大于x_W时不计算, status设为"infeasible"。
+
+        Args:
+            max_plate(int): 允许的最大塔板数
+            time_limit(float): 允许的最长计算时间(秒), 为None时不限制
+            tolerance(float): 相邻两板液相组成之差小于该值与上一板到x_W距离之积时视为恒浓
+            callback(callable): 每块板计算前以已算出的塔板数调用, 返回False时停止计算, status设为"cancelled"
+            store_trajectory(bool): 是否把各板组成保存到trajectory属性, 为False时只计数, 不保存轨迹
+            kremser_tolerance(float): 最下一段允许解析跳步时的塔板数容差, 为None或平衡模型没有stripping_jump时全部逐板计算
+
+        Returns:
+            tuple: (塔板数, 各物流所在板号的列表, 顺序同streams属性), 无法分离时为(NaN, [])
+        """
+        plate, switch_plates, self.status, self.trajectory = stepping.step(
+            self.model, self.segments, self.x_D, self.x_W, max_plate, time_limit, tolerance, callback,
+            store_trajectory, kremser_tolerance)
+        if self.status != "converged":
+            return np.nan, []
+        return plate, switch_plates
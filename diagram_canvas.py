@@ -0,0 +1,58 @@
+"""
+主窗口内嵌的塔板图画布
+静态部分(坐标轴、对角线、平衡线、图例)只在改变时完整重绘一次并缓存为背景,
+每次计算后只在背景上重画操作线、q线与阶梯线(blitting)。
+"""
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+
+import diagram_export
+
+class DiagramCanvas(FigureCanvasQTAgg, diagram_export.Diagram):
+    def __init__(self, parent=None):
+        """
+        建立画布与线条
+
+        Args:
+            parent(QWidget): 父控件
+        """
+        super().__init__(Figure(figsize=(5, 5)))
+        self.setParent(parent)
+        self.setup_axes(self.figure)
+        for line in self.dynamic_lines:
+            line.set_animated(True)
+
+        self.background = None
+        self.mpl_connect("draw_event", self.on_draw)
+
+    def on_draw(self, event):
+        """完整重绘(包括窗口缩放)后缓存背景, 并画上动态线条"""
+        self.background = self.copy_from_bbox(self.figure.bbox)
+        self.draw_dynamic_lines()
+
+    def draw_dynamic_lines(self):
+        """在当前画面上画动态线条"""
+        for line in self.dynamic_lines:
+            self.axes.draw_artist(line)
+
+    def update_diagram(self, process):
+        """用已完成calculate_theory_plate的计算对象更新塔板图
+
+        Args:
+            process: FullReflux, FullRefluxNonIdeal, PartialReflux或PartialRefluxNonIdeal的实例
+        """
+        if self.update_lines(process) or self.background is None:
+            with diagram_export.quiet_missing_glyphs():
+                self.draw()
+        else:
+            self.restore_region(self.background)
+            self.draw_dynamic_lines()
+        self.blit(self.figure.bbox)
+
+    def clear_diagram(self):
+        """清除动态线条, 用于计算失败时"""
+        for line in self.dynamic_lines:
+            line.set_data([], [])
+        if self.background is not None:
+            self.restore_region(self.background)
+            self.blit(self.figure.bbox)
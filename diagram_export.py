@@ -0,0 +1,151 @@
+"""
+无界面批量导出塔板图
+使用非交互的Agg画布, 所有工况共用同一个Figure和Axes, 每个工况只更新线条数据后保存,
+文件格式由后缀决定(png, svg, pdf等)。
+中文字体只设置在标题与图例上, 不修改matplotlib的全局rcParams; 没有中文字体时使用默认字体, 不输出缺字警告。
+"""
+import contextlib
+import functools
+import warnings
+
+from matplotlib import font_manager
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+
+CHINESE_FONTS = ("Microsoft YaHei", "SimHei", "PingFang SC", "Noto Sans CJK SC", "Source Han Sans SC",
+                 "WenQuanYi Zen Hei")
+
+
+@functools.lru_cache(maxsize=None)
+def chinese_font():
+    """按CHINESE_FONTS的顺序选择已安装的中文字体, 只查找一次
+
+    直接在已注册的字体中按名称查找, 不调用findfont, 避免没有该字体时输出findfont警告。
+
+    Returns:
+        FontProperties or None: 中文字体, 没有时为None(使用默认字体)
+    """
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    for name in CHINESE_FONTS:
+        if name in installed:
+            return font_manager.FontProperties(family=[name])
+    return None
+
+
+@contextlib.contextmanager
+def quiet_missing_glyphs():
+    """绘制塔板图时使用的上下文, 没有中文字体时忽略缺字警告, 有中文字体时不做任何处理"""
+    with warnings.catch_warnings():
+        if chinese_font() is None:
+            warnings.filterwarnings("ignore", message="Glyph .* missing from font", category=UserWarning)
+        yield
+
+
+def staircase(x, y):
+    """把逐板计算结果转换为阶梯折线的顶点
+
+    第i块板为水平线 (x_i, y_i) -> (x_{i+1}, y_i) 与竖直线 (x_{i+1}, y_i) -> (x_{i+1}, y_{i+1})
+
+    Args:
+        x(ndarray): 各板液相组成
+        y(ndarray): 各板汽相组成
+
+    Returns:
+        tuple: (阶梯x数组, 阶梯y数组)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x_step = np.empty(2 * len(x) - 1)
+    y_step = np.empty(2 * len(y) - 1)
+    x_step[0::2] = x
+    x_step[1::2] = x[1:]
+    y_step[0::2] = y
+    y_step[1::2] = y[:-1]
+    return x_step, y_step
+
+
+class Diagram:
+    """塔板图的线条集合
+
+    对角线为静态线条; 平衡线、标题与图例只在物系或回流方式改变时更新;
+    操作线、q线与阶梯线为动态线条, 每次计算后更新数据。
+    """
+    def setup_axes(self, figure):
+        """在figure上建立坐标轴与所有线条
+
+        Args:
+            figure(Figure): matplotlib.figure.Figure 类的实例
+        """
+        self.axes = figure.add_subplot()
+        self.axes.set_xlabel('x')
+        self.axes.set_ylabel('y')
+        self.axes.set_xlim(0, 1)
+        self.axes.set_ylim(0, 1)
+
+        self.x_for_global = np.linspace(0, 1, 50)
+        self.axes.plot(self.x_for_global, self.x_for_global, label="y = x")
+        self.equilibrium_line, = self.axes.plot([], [], label="平衡线")
+        self.rectification_line, = self.axes.plot([], [], label="精馏段操作线")
+        self.q_line, = self.axes.plot([], [], label="q线")
+        self.stripping_line, = self.axes.plot([], [], label="提馏段操作线")
+        self.staircase_line, = self.axes.plot([], [], color="black")
+        self.dynamic_lines = [self.rectification_line, self.q_line, self.stripping_line, self.staircase_line]
+
+    def update_lines(self, process):
+        """用已完成calculate_theory_plate的计算对象更新线条数据
+
+        Args:
+            process: FullReflux, FullRefluxNonIdeal, PartialReflux或PartialRefluxNonIdeal的实例
+
+        Returns:
+            bool: 平衡线、标题或图例是否改变(静态部分需要重绘)
+        """
+        partial = hasattr(process, "ratio")
+        title = "精馏塔理论板图(部分回流)" if partial else "精馏塔理论板图(全回流)"
+        equilibrium_y = np.asarray(process.equilibrium_line(self.x_for_global), dtype=float)
+        static_changed = (title != self.axes.get_title() or
+                          not np.array_equal(equilibrium_y, self.equilibrium_line.get_ydata()))
+
+        self.staircase_line.set_data(*staircase(process.trajectory.x, process.trajectory.y))
+        if partial:
+            x_I, y_I = process.intersection
+            x_for_rectification = np.array([0, process.x_D])
+            self.rectification_line.set_data(x_for_rectification,
+                                             process.operating_line_of_rectification_section(x_for_rectification))
+            self.q_line.set_data([process.z_F, x_I], [process.z_F, y_I])
+            self.stripping_line.set_data([process.x_W, x_I], [process.x_W, y_I])
+        else:
+            for line in (self.rectification_line, self.q_line, self.stripping_line):
+                line.set_data([], [])
+
+        if static_changed:
+            self.axes.set_title(title, fontproperties=chinese_font())
+            self.equilibrium_line.set_data(self.x_for_global, equilibrium_y)
+            handles = [line for line in self.axes.get_lines()[:5] if len(line.get_xdata())]
+            self.axes.legend(handles=handles, prop=chinese_font())
+        return static_changed
+
+
+class DiagramExporter(Diagram):
+    def __init__(self, figsize=(8, 8)):
+        """
+        建立共用的画布与线条
+
+        Args:
+            figsize(tuple): 图像尺寸(英寸)
+        """
+        self.figure = Figure(figsize=figsize)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.setup_axes(self.figure)
+
+    def render(self, process, path):
+        """把已完成calculate_theory_plate的计算对象画成塔板图并保存
+
+        Args:
+            process: FullReflux, FullRefluxNonIdeal, PartialReflux或PartialRefluxNonIdeal的实例
+            path(str): 输出文件路径
+        """
+        self.update_lines(process)
+        with quiet_missing_glyphs():
+            self.figure.savefig(path)
@@ -0,0 +1,100 @@
+"""
+相平衡插值器缓存
+非理想物系的各计算类在每次实例化时都要检查数据单调性并建立正、反两个PCHIP插值器,
+同一组相平衡数据反复计算(扫描q、R、z_F等)时, 用数据的哈希值作为键缓存建好的插值器(及反函数查表),
+只在第一次使用该组数据时建立。
+"""
+from collections import OrderedDict
+import hashlib
+
+import numpy as np
+
+import equilibrium_table
+
+MAX_SIZE = 16
+_cache = OrderedDict()
+
+
+def fingerprint(equilibrium_x, equilibrium_y):
+    """计算相平衡数据的哈希值
+
+    Args:
+        equilibrium_x (list or ndarray): 液相平衡组成数据
+        equilibrium_y (list or ndarray): 汽相平衡组成数据
+
+    Returns:
+        str: 数据的SHA-1十六进制摘要
+    """
+    x = np.ascontiguousarray(equilibrium_x, dtype=float)
+    y = np.ascontiguousarray(equilibrium_y, dtype=float)
+    digest = hashlib.sha1()
+    digest.update(np.array([x.size, y.size]).tobytes())
+    digest.update(x.tobytes())
+    digest.update(y.tobytes())
+    return digest.hexdigest()
+
+
+def get_interpolators(equilibrium_x, equilibrium_y):
+    """取得相平衡数据的正、反PCHIP插值器, 不在缓存中时建立并缓存
+
+    缓存最多保存MAX_SIZE组数据, 超出时丢弃最久未使用的一组。
+
+    Args:
+        equilibrium_x (list or ndarray): 液相平衡组成数据
+        equilibrium_y (list or ndarray): 汽相平衡组成数据
+
+    Returns:
+        tuple: (forward_interp, inverse_interp), 分别由x计算y与由y计算x
+
+    Raises:
+        ValueError: y数据不是严格单调递增
+    """
+    key = fingerprint(equilibrium_x, equilibrium_y)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    # scipy只在第一次建立插值器时导入, 理想物系的计算不需要它
+    from scipy import interpolate
+
+    equilibrium_x = np.array(equilibrium_x, dtype=float)
+    equilibrium_y = np.array(equilibrium_y, dtype=float)
+    if not np.all(np.diff(equilibrium_y) > 0):
+        raise ValueError("y数据必须严格单调递增以保证反函数存在")
+
+    # 创建 PCHIP 插值器
+    interpolators = (interpolate.PchipInterpolator(equilibrium_x, equilibrium_y),
+                     interpolate.PchipInterpolator(equilibrium_y, equilibrium_x))
+    _cache[key] = interpolators
+    if len(_cache) > MAX_SIZE:
+        _cache.popitem(last=False)
+    return interpolators
+
+
+def get_inverse_table(equilibrium_x, equilibrium_y, size=4096):
+    """取得平衡线反函数的查表对象, 不在缓存中时建立并缓存
+
+    Args:
+        equilibrium_x (list or ndarray): 液相平衡组成数据
+        equilibrium_y (list or ndarray): 汽相平衡组成数据
+        size(int): 表的网格点数
+
+    Returns:
+        EquilibriumTable: 由y计算x的查表对象, error属性为查表的最大误差
+    """
+    key = f"{fingerprint(equilibrium_x, equilibrium_y)}:{size}"
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    _, inverse_interp = get_interpolators(equilibrium_x, equilibrium_y)
+    table = equilibrium_table.EquilibriumTable(inverse_interp, size)
+    _cache[key] = table
+    if len(_cache) > MAX_SIZE:
+        _cache.popitem(last=False)
+    return table
+
+
+def clear():
+    """清空缓存"""
+    _cache.clear()
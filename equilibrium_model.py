@@ -0,0 +1,116 @@
+"""
+逐板计算使用的平衡模型
+逐板计算核心(stepping.step)只通过 equilibrium_line_inverse 使用平衡模型,
+作图时使用 equilibrium_line。有解析跳步公式的模型另外提供 stripping_jump,
+没有时逐板计算核心总是逐板计算。
+
+可用的模型:
+    ConstantAlpha: 恒定相对挥发度
+    InterpolatedEquilibrium: 由相平衡数据建立的PCHIP插值器, 或反函数查表
+    activity_model中的VanLaar, Wilson, NRTL: 活度系数模型
+"""
+import numpy as np
+
+import equilibrium_cache
+import kremser
+
+class ConstantAlpha:
+    def __init__(self, alpha):
+        """
+        恒定相对挥发度的平衡线 y = αx / (1 + (α - 1)x)
+
+        Args:
+            alpha(float): 相对挥发度
+        """
+        self.alpha = alpha
+
+    def equilibrium_line(self, x):
+        """平衡线, 从x计算y
+
+        Args:
+            x(ndarray or float): 液相平衡组成
+
+        Returns:
+            ndarray or float: 汽相平衡组成
+        """
+        y = self.alpha * x / (1 + (self.alpha - 1) * x)
+        return y
+
+    def equilibrium_line_inverse(self, y):
+        """平衡线, 从y计算x
+
+        Args:
+            y(ndarray or float): 汽相平衡组成
+
+        Returns:
+            ndarray or float: 液相平衡组成
+        """
+        x = (-y) / (y * self.alpha - y - self.alpha)
+        return x
+
+    def stripping_jump(self, slope, x_W, x_current, tolerance, max_stage):
+        """用Smoker方程精确跳步, 没有近似误差
+
+        Args:
+            slope(float): 操作线斜率, 操作线过(x_W, x_W)
+            x_W(float): 轻组分塔底摩尔分数
+            x_current(float): 当前板的液相组成
+            tolerance(float): 允许的塔板数误差, 精确跳步不使用
+            max_stage(int): 最多跳过的板数
+
+        Returns:
+            tuple or None: (跳过的各板液相组成, 塔板数误差估计0), 不能跳步时为None
+        """
+        jump = kremser.smoker_jump(self.alpha, slope, x_W, x_current, max_stage)
+        return None if jump is None else (jump, 0.0)
+
+
+class InterpolatedEquilibrium:
+    def __init__(self, equilibrium_x, equilibrium_y, table_size=None):
+        """
+        由相平衡数据建立的平衡线
+
+        Args:
+            equilibrium_x (list or ndarray): 液相平衡组成数据
+            equilibrium_y (list or ndarray): 汽相平衡组成数据
+            table_size(int): 反函数查表的网格点数, 为None时直接使用PCHIP插值器
+
+        Raises:
+            ValueError: y数据不是严格单调递增
+        """
+        self.equilibrium_x = np.array(equilibrium_x)
+        self.equilibrium_y = np.array(equilibrium_y)
+
+        # 检查单调性并创建 PCHIP 插值器, 同一组数据只建立一次
+        self.forward_interp, self.inverse_interp = equilibrium_cache.get_interpolators(self.equilibrium_x,
+                                                                                        self.equilibrium_y)
+        self.table_error = None
+        if table_size is not None:
+            # 查表模式: 反函数改为在均匀网格上查表并线性插值, table_error为查表的最大误差
+            self.inverse_interp = equilibrium_cache.get_inverse_table(self.equilibrium_x, self.equilibrium_y,
+                                                                      table_size)
+            self.table_error = self.inverse_interp.error
+
+    def equilibrium_line(self, x):
+        """平衡线, 从x计算y
+
+        Args:
+            x(ndarray or float): 液相平衡组成
+
+        Returns:
+            ndarray or float: 汽相平衡组成
+        """
+        y = self.forward_interp(x)
+        return y
+
+    def equilibrium_line_inverse(self, y):
+        """平衡线, 从y计算x
+
+        Args:
+            y(ndarray or float): 汽相平衡组成
+
+        Returns:
+            ndarray or float: 液相平衡组成
+        """
+        x = self.inverse_interp(y)
+        return x
@@ -0,0 +1,52 @@
+"""
+平衡线反函数查表
+逐板计算时每块板都要由y求x, 直接调用PchipInterpolator对单个数值求值开销较大。
+把反函数预先在均匀的y网格上求值成表, 逐板计算时只需计算下标并线性插值,
+建表时在相邻网格点之间取点与原插值器比较, 给出查表的最大误差。
+"""
+import numpy as np
+
+class EquilibriumTable:
+    def __init__(self, function, size=4096, y_min=0.0, y_max=1.0, check_points=8):
+        """
+        在均匀网格上建立函数表
+
+        Args:
+            function(callable): 被制表的函数, 接受ndarray, 如平衡线反函数
+            size(int): 网格点数
+            y_min(float): 网格下限
+            y_max(float): 网格上限
+            check_points(int): 估计误差时每个网格区间内取的点数
+        """
+        self.size = size
+        self.y_min = y_min
+        self.y_max = y_max
+        self.grid = np.linspace(y_min, y_max, size)
+        self.values = np.asarray(function(self.grid), dtype=float)
+        self.step = (y_max - y_min) / (size - 1)
+        self.inverse_step = 1 / self.step
+        # 标量查表时使用Python列表, 避免NumPy标量的开销
+        self.value_list = self.values.tolist()
+
+        check = np.linspace(y_min, y_max, (size - 1) * check_points + 1)
+        self.error = float(np.max(np.abs(np.interp(check, self.grid, self.values) - function(check))))
+
+    def __call__(self, y):
+        """查表并线性插值
+
+        Args:
+            y(ndarray or float): 自变量, 超出网格范围时按端点区间外推
+
+        Returns:
+            ndarray or float: 函数值
+        """
+        if not isinstance(y, float):
+            return np.interp(y, self.grid, self.values)
+        t = (y - self.y_min) * self.inverse_step
+        i = int(t)
+        if i < 0:
+            i = 0
+        elif i > self.size - 2:
+            i = self.size - 2
+        x_left = self.value_list[i]
+        return x_left + (t - i) * (self.value_list[i + 1] - x_left)
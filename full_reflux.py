@@ -1,5 +1,8 @@
 import numpy as np
 
+import equilibrium_model
+import stepping
+
 class FullReflux:
     """全回流类
     
@@ -14,6 +17,7 @@ class FullReflux:
         self.alpha = alpha
         self.x_D = x_D
         self.x_W = x_W
+        self.model = equilibrium_model.ConstantAlpha(alpha)
 
     def equilibrium_line(self, x):
         """平衡线计算
@@ -24,8 +28,7 @@ class FullReflux:
         Returns:
             float: 汽相组分
         """
-        y = self.alpha * x / (1 + (self.alpha - 1) * x)
-        return y
+        return self.model.equilibrium_line(x)
     
     def equilibrium_line_inverse(self, y):
         """平衡线反函数计算
@@ -36,24 +39,58 @@ class FullReflux:
         Returns:
             float: 液相组分
         """
-        x = (-y) / (y * self.alpha - y - self.alpha)
-        return x
+        return self.model.equilibrium_line_inverse(y)
     
-    def calculate_theory_plate(self):
+    def calculate_theory_plate(self, max_plate=10000, time_limit=None, tolerance=1e-12, callback=None,
+                               store_trajectory=True, kremser_tolerance=None):
         """计算全回流理论塔板数
 
+        逐板计算时若液相组成不再下降(恒浓区)、塔板数超过max_plate或耗时超过time_limit,
+        则停止计算, 并将status属性设为"pinched"、"max_plate"或"timeout", 正常结束时为"converged"。
+        x_D不大于x_W时不计算, status设为"infeasible"。
+
+        Args:
+            max_plate(int): 允许的最大塔板数
+            time_limit(float): 允许的最长计算时间(秒), 为None时不限制
+            tolerance(float): 相邻两板液相组成之差小于该值与上一板到x_W距离之积时视为恒浓
+            callback(callable): 每块板计算前以已算出的塔板数调用, 返回False时停止计算, status设为"cancelled"
+            store_trajectory(bool): 是否把各板组成保存到trajectory属性, 为False时只计数, 不保存轨迹
+            kremser_tolerance(float): 允许用Smoker方程跳步时的塔板数容差, 为None时全部逐板计算
+
         Returns:
-            float: 理论塔板数
+            float: 理论塔板数, 无法分离时为NaN
         """ 
-        plate = 0
-        self.x_list = [self.x_D]      
-        self.y_list = [self.x_D]
-
-        while(self.x_list[-1] > self.x_W):
-            plate += 1
-            x_temp = self.equilibrium_line_inverse(self.y_list[-1])
-            self.x_list.append(x_temp)
-            self.y_list.append(x_temp)
-
-        plate -= (self.x_list[-1] - self.x_W) / (self.x_list[-1] - self.x_list[-2])
-        return plate
\ No newline at end of file
+        plate, _, self.status, self.trajectory = stepping.step(
+            self.model, stepping.DIAGONAL, self.x_D, self.x_W,
+            max_plate, time_limit, tolerance, callback, store_trajectory, kremser_tolerance)
+        return plate
+
+    def calculate_theory_plate_fenske(self):
+        """用Fenske方程解析计算全回流理论塔板数
+
+        全回流时每块板满足 x_n / (1 - x_n) = (x_D / (1 - x_D)) / α^n,
+        因此逐板计算的最后一块板 n = ceil(ln(S) / ln(α)), S为分离因子,
+        再按逐板计算相同的方式取小数部分, 结果与calculate_theory_plate一致。
+        alpha, x_D, x_W 可为数组, 按NumPy广播规则同时计算所有工况。
+        α ≤ 1 或不满足 0 < x_W < x_D < 1 的工况无法分离, 与逐板计算一致返回NaN。
+
+        Returns:
+            ndarray or float: 理论塔板数, 无法分离的工况为NaN
+        """
+        alpha = np.asarray(self.alpha, dtype=float)
+        x_D = np.asarray(self.x_D, dtype=float)
+        x_W = np.asarray(self.x_W, dtype=float)
+        separable = (alpha > 1) & (x_W > 0) & (x_W < x_D) & (x_D < 1)
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            separation_factor = (x_D / (1 - x_D)) * ((1 - x_W) / x_W)
+            n = np.maximum(np.ceil(np.log(separation_factor) / np.log(alpha)), 1)
+
+            # 由 x/(1-x) 的比值反推第n块板与第n-1块板的液相组成
+            ratio_last = (x_D / (1 - x_D)) / alpha ** n
+            ratio_before_last = ratio_last * alpha
+            x_last = ratio_last / (1 + ratio_last)
+            x_before_last = ratio_before_last / (1 + ratio_before_last)
+
+            plate = n - (x_last - x_W) / (x_last - x_before_last)
+        return np.where(separable, plate, np.nan)[()]
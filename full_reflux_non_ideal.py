@@ -1,8 +1,10 @@
 import numpy as np
-from scipy import interpolate
+
+import equilibrium_model
+import stepping
 
 class FullRefluxNonIdeal:
-    def __init__(self, equilibrium_x, equilibrium_y, x_D, x_W):
+    def __init__(self, equilibrium_x, equilibrium_y, x_D, x_W, table_size=None):
         """
         处理部分回流、非理想物系的理论塔板
         
@@ -11,19 +13,18 @@ class FullRefluxNonIdeal:
             equilibrium_y (list): 汽相平衡组成数据列表
             x_D(float): 轻组分塔顶摩尔分数
             x_W(float): 轻组分塔底摩尔分数
+            table_size(int): 反函数查表的网格点数, 为None时直接使用PCHIP插值器
         """
         self.equilibrium_x = np.array(equilibrium_x)
         self.equilibrium_y = np.array(equilibrium_y)
         self.x_D = x_D
         self.x_W = x_W
 
-        if not np.all(np.diff(self.equilibrium_y) > 0):
-            raise ValueError("y数据必须严格单调递增以保证反函数存在")
-        
-        # 创建 PCHIP 插值器
-        self.forward_interp = interpolate.PchipInterpolator(self.equilibrium_x, self.equilibrium_y)
-        self.inverse_interp = interpolate.PchipInterpolator(self.equilibrium_y, self.equilibrium_x)
-
+        # 检查单调性并创建 PCHIP 插值器, 同一组数据只建立一次
+        self.model = equilibrium_model.InterpolatedEquilibrium(self.equilibrium_x, self.equilibrium_y, table_size)
+        self.forward_interp = self.model.forward_interp
+        self.inverse_interp = self.model.inverse_interp
+        self.table_error = self.model.table_error
 
     def equilibrium_line(self, x):
         """平衡线, 从x计算y
@@ -34,8 +35,7 @@ class FullRefluxNonIdeal:
         Returns:
             ndarray or float: 汽相平衡组成
         """
-        y = self.forward_interp(x)
-        return y  
+        return self.model.equilibrium_line(x)
 
 
     def equilibrium_line_inverse(self, y):
@@ -47,25 +47,29 @@ class FullRefluxNonIdeal:
         Returns:
             ndarray or float: 液相平衡组成
         """
-        x = self.inverse_interp(y)
-        return x 
+        return self.model.equilibrium_line_inverse(y)
     
 
-    def calculate_theory_plate(self):
+    def calculate_theory_plate(self, max_plate=10000, time_limit=None, tolerance=1e-12, callback=None,
+                               store_trajectory=True, kremser_tolerance=None):
         """计算全回流理论塔板数
 
-        Returns:
-            float: 理论塔板数
-        """ 
-        plate = 0
-        self.x_list = [self.x_D]      
-        self.y_list = [self.x_D]
+        逐板计算时若液相组成不再下降(恒浓区)、塔板数超过max_plate或耗时超过time_limit,
+        则停止计算, 并将status属性设为"pinched"、"max_plate"或"timeout", 正常结束时为"converged"。
+        x_D不大于x_W时不计算, status设为"infeasible"。
 
-        while(self.x_list[-1] > self.x_W):
-            plate += 1
-            x_temp = self.equilibrium_line_inverse(self.y_list[-1])
-            self.x_list.append(x_temp)
-            self.y_list.append(x_temp)
+        Args:
+            max_plate(int): 允许的最大塔板数
+            time_limit(float): 允许的最长计算时间(秒), 为None时不限制
+            tolerance(float): 相邻两板液相组成之差小于该值与上一板到x_W距离之积时视为恒浓
+            callback(callable): 每块板计算前以已算出的塔板数调用, 返回False时停止计算, status设为"cancelled"
+            store_trajectory(bool): 是否把各板组成保存到trajectory属性, 为False时只计数, 不保存轨迹
+            kremser_tolerance(float): 为与理想物系接口一致而保留, 插值平衡线没有精确的跳步公式, 总是逐板计算
 
-        plate -= (self.x_list[-1] - self.x_W) / (self.x_list[-1] - self.x_list[-2])
+        Returns:
+            float: 理论塔板数, 无法分离时为NaN
+        """ 
+        plate, _, self.status, self.trajectory = stepping.step(
+            self.model, stepping.DIAGONAL, self.x_D, self.x_W,
+            max_plate, time_limit, tolerance, callback, store_trajectory, kremser_tolerance)
         return plate
@@ -0,0 +1,58 @@
+"""
+提馏段的解析跳步
+x_W很低时, 提馏段靠近塔底要走大量很小的台阶。恒定相对挥发度时提馏段的逐板关系是分式线性变换,
+可用Smoker方程(Kremser方程在非稀溶液区的精确形式)一次算出整段的各板组成, 没有近似误差。
+跳步总是停在越过目标之前的一块板, 最后一块板仍逐板计算, 因此小数塔板的计算方式与逐板计算相同。
+
+插值平衡线与活度系数模型没有这样的精确解。用弦线线性化后按Kremser方程跳步时,
+为保证塔板数误差而反复计算平衡线反函数的开销超过了省下的逐板计算, 实测反而更慢, 因此这些模型总是逐板计算。
+"""
+import math
+
+import numpy as np
+
+
+def smoker_jump(alpha, slope, x_W, x_current, max_stage, min_stage=4):
+    """恒定相对挥发度时在提馏段从x_current向x_W跳步
+
+    α恒定时 g(y) = y / (α - (α - 1)y), 逐板关系 x_(n+1) = g(s x_n + d) 是分式线性变换
+        x_(n+1) = (a x_n + b) / (c x_n + e),  a = s, b = d, c = -(α - 1)s, e = α - (α - 1)d
+    设其两个不动点为x1(吸引)与x2, 则 (x_n - x1) / (x_n - x2) = K^n (x_0 - x1) / (x_0 - x2),
+    K = (c x2 + e) / (c x1 + e), 即Smoker方程, 是Kremser方程在非稀溶液区的精确推广, 没有线性化误差。
+
+    Args:
+        alpha(float): 相对挥发度
+        slope(float): 提馏段操作线斜率s, 操作线过(x_W, x_W)
+        x_W(float): 轻组分塔底摩尔分数
+        x_current(float): 当前板的液相组成, 其汽相组成在操作线上
+        max_stage(int): 最多跳过的板数
+        min_stage(int): 跳过的板数少于该值时不跳步
+
+    Returns:
+        ndarray or None: 跳过的各板液相组成, 不能跳步时为None
+    """
+    a = slope
+    b = x_W * (1 - slope)
+    c = -(alpha - 1) * slope
+    e = alpha - (alpha - 1) * b
+    # c x² + (e - a) x - b = 0, 用不损失精度的求根公式
+    discriminant = (e - a) ** 2 + 4 * c * b
+    if not discriminant > 0 or c == 0:
+        return None
+    q = -0.5 * ((e - a) + math.copysign(math.sqrt(discriminant), e - a))
+    x_1, x_2 = q / c, -b / q
+    if abs(c * x_1 + e) < abs(c * x_2 + e):
+        x_1, x_2 = x_2, x_1
+    K = (c * x_2 + e) / (c * x_1 + e)
+    ratio = (x_current - x_1) / (x_current - x_2)
+    target = (x_W - x_1) / (x_W - x_2)
+    if not (0 < K < 1 and target / ratio > 0):
+        return None
+    stage = math.log(target / ratio) / math.log(K)
+    if not stage > 0:
+        return None
+    count = min(math.ceil(stage) - 1, max_stage)
+    if count < min_stage:
+        return None
+    Q = ratio * K ** np.arange(1, count + 1)
+    return (x_1 - x_2 * Q) / (1 - Q)
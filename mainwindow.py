@@ -1,5 +1,5 @@
-from PySide6.QtWidgets import QMainWindow, QWidget, QStatusBar, QMessageBox, QFileDialog
-from PySide6.QtCore import QDateTime
+from PySide6.QtWidgets import QMainWindow, QWidget, QStatusBar, QMessageBox, QFileDialog, QVBoxLayout
+from PySide6.QtCore import QDateTime, QThreadPool
 from ui_mainwindow import Ui_MainWindow
 from ui_widget import Ui_Widget
 
@@ -8,20 +8,23 @@ import partial_reflux_non_ideal
 import full_reflux
 import full_reflux_non_ideal
 import data_check
+import vle_store
+import vle_fit
+import calculation_worker
+import profiling
 
-import matplotlib.pyplot as plt 
-import matplotlib
 import numpy as np
-import pandas as pd
 
 class MainWindow(QMainWindow, Ui_MainWindow):
-    def __init__(self, app):
+    def __init__(self, app, profile=False):
         super().__init__()
         self.app = app
+        self.profile = profile
         self.setupUi(self)
         self.setWindowTitle("精馏理论塔板")
 
         self.pushButton_draw.clicked.connect(self.draw_diagram)
+        self.pushButton_cancel.clicked.connect(self.cancel_calculation)
         self.pushButton_quit.clicked.connect(self.app.quit)
 
         self.statusBar = QStatusBar()
@@ -50,6 +53,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.equilibrium_x = []
         self.equilibrium_y = []
 
+        self.worker = None
+        self.timer = None
+        self.canvas = None
+        layout = QVBoxLayout(self.widget_plot)
+        layout.setContentsMargins(0, 0, 0, 0)
+
     def connect_signal(self):
         """连接所有信号槽"""
         self.radioButton_full.toggled.connect(self.update_lineEdit)
@@ -201,6 +210,144 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             else:
                 self.draw_diagram_for_partial_reflux_special()
         
+    def show_calculation_failed(self, status):
+        """清除塔板图中的操作线与阶梯线并显示无法分离的原因
+
+        Args:
+            status(str): 计算类的status属性
+        """
+        if self.canvas is not None:
+            self.canvas.clear_diagram()
+        current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
+        if status == "cancelled":
+            self.textBrowser_output.append(f"======== {current_time} 计算已取消========")
+            return
+        reasons = {
+            "pinched": "操作线与平衡线相交或相切(恒浓区), 回流比可能小于最小回流比",
+            "max_plate": "理论板数超过上限",
+            "timeout": "计算超时",
+            "infeasible": "塔顶组成须大于塔底组成",
+        }
+        self.textBrowser_output.append(f"======== {current_time} 无法分离========\n"
+                                       f"{reasons.get(status, status)}")
+        QMessageBox.critical(
+            self,
+            "错误",
+            f" 无法分离, 计算已终止。\n{reasons.get(status, status)}",
+            QMessageBox.Ok
+        )
+
+    def get_canvas(self):
+        """取得内嵌的塔板图画布, 第一次调用时导入matplotlib并建立画布
+
+        Returns:
+            DiagramCanvas: 画布
+        """
+        if self.canvas is None:
+            import diagram_canvas
+            self.canvas = diagram_canvas.DiagramCanvas(self.widget_plot)
+            self.widget_plot.layout().addWidget(self.canvas)
+        return self.canvas
+
+    def start_calculation(self, process, show_result):
+        """在后台线程中计算理论塔板, 计算期间只允许取消
+
+        Args:
+            process: 计算对象
+            show_result(callable): 计算完成后在主线程中以(process, 计算结果)调用
+        """
+        self.worker = calculation_worker.CalculationWorker(process, timer=self.timer)
+        self.worker.signals.progress.connect(self.update_progress)
+        self.worker.signals.finished.connect(lambda result: show_result(process, result))
+        self.worker.signals.finished.connect(self.finish_calculation)
+        self.worker.signals.failed.connect(self.show_calculation_error)
+        self.worker.signals.failed.connect(self.finish_calculation)
+        self.pushButton_draw.setEnabled(False)
+        self.pushButton_cancel.setEnabled(True)
+        self.statusBar.showMessage("正在计算...", 0)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def update_progress(self, plate):
+        """在状态栏显示已算出的塔板数"""
+        self.statusBar.showMessage(f"正在计算: 已算出{plate}块板", 0)
+
+    def cancel_calculation(self):
+        """取消正在进行的计算"""
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def finish_calculation(self):
+        """计算结束后恢复按钮与状态栏"""
+        self.worker = None
+        self.pushButton_draw.setEnabled(True)
+        self.pushButton_cancel.setEnabled(False)
+        self.update_statusBar()
+
+    def show_calculation_error(self, message):
+        """显示后台计算中出现的错误
+
+        Args:
+            message(str): 错误信息
+        """
+        QMessageBox.critical(
+            self,
+            "错误",
+            f" 计算出错, 计算已终止。\n{message}",
+            QMessageBox.Ok
+        )
+
+    def show_partial_reflux_result(self, process, result):
+        """显示部分回流的计算结果并作图
+
+        Args:
+            process: PartialReflux或PartialRefluxNonIdeal的实例
+            result(tuple): (塔板数，最佳进料板)
+        """
+        plate, plate_for_loading = result
+        if np.isnan(plate):
+            self.show_calculation_failed(process.status)
+            return
+        print(f"理论板数: {plate}\n加料板: {plate_for_loading}")
+
+        with self.timer.phase("render"):
+            self.get_canvas().update_diagram(process)
+
+        # 在程序中显示结果
+        current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
+        plain_content = (f"======== {current_time} 部分回流结果========\n" 
+                        f"最优加料板: {plate_for_loading}\n" 
+                        f"理论板数: {round(plate, 2)}")
+        self.textBrowser_output.append(plain_content)
+        self.show_timings()
+
+    def show_full_reflux_result(self, process, plate):
+        """显示全回流的计算结果并作图
+
+        Args:
+            process: FullReflux或FullRefluxNonIdeal的实例
+            plate(float): 理论板数
+        """
+        if np.isnan(plate):
+            self.show_calculation_failed(process.status)
+            return
+        print(f"理论板数: {plate}")
+
+        with self.timer.phase("render"):
+            self.get_canvas().update_diagram(process)
+
+        # 在程序中显示结果
+        current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
+        plain_content = (f"======== {current_time} 全回流结果========\n" 
+                        f"理论板数: {round(plate, 2)}")
+        self.textBrowser_output.append(plain_content)
+        self.show_timings()
+
+    def show_timings(self):
+        """在输出框显示本次计算各阶段的耗时, 开启cProfile时在控制台打印函数调用统计"""
+        self.textBrowser_output.append(f"各阶段耗时:\n{self.timer.report()}")
+        if self.profile:
+            print(self.timer.profile_stats())
+
     # 以下代码是业务逻辑核心
     def draw_diagram_for_partial_reflux(self):
         """计算部分回流理论塔板并作图"""
@@ -214,61 +361,18 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             )
             return 
         
-        alpha = eval(self.lineEdit_alpha.text())
-        ratio = eval(self.lineEdit_ratio.text())
-        q = eval(self.lineEdit_q.text())
-        z_F = eval(self.lineEdit_z_F.text())
-        x_D = eval(self.lineEdit_x_D.text())
-        x_W = eval(self.lineEdit_x_W.text())
-        partial_reflux_process = partial_reflux.PartialReflux(alpha, q, ratio, z_F, x_D, x_W)
-
-        x_for_global = np.linspace(0, 1, 50)
-        x_for_qline = np.linspace(min([partial_reflux_process.intersection[0], z_F]), 
-                                  max([partial_reflux_process.intersection[0], z_F]), 50)
-        x_for_rectification = np.linspace(0, x_D, 50)
-        x_for_stripping = np.linspace(x_W, partial_reflux_process.intersection[0], 50)
-        
-        matplotlib.rcParams['font.family']='Microsoft YaHei'
-        matplotlib.rcParams['axes.unicode_minus']=False
-        plt.figure(figsize=(8, 8))
-        plt.title("精馏塔理论板图(部分回流)")
-        plt.xlabel('x')
-        plt.ylabel('y')
-        plt.xlim(0, 1)
-        plt.ylim(0, 1)
-
-        plt.plot(x_for_global, x_for_global, label="y = x")
-        plt.plot(x_for_global, partial_reflux_process.equilibrium_line(x_for_global), label="平衡线")
-        plt.plot(x_for_rectification, partial_reflux_process.operating_line_of_rectification_section(x_for_rectification),
-                                                                                      label="精馏段操作线")
-        if q != 1:
-            plt.plot(x_for_qline, partial_reflux_process.q_line(x_for_qline), label="q线")
-        else:
-            plt.axvline(x=z_F, ymin=z_F, ymax=partial_reflux_process.intersection[1], label="q线")
-        plt.plot(x_for_stripping, partial_reflux_process.operating_line_of_stripping_section(x_for_stripping),
-                                                                                label="提馏段操作线")
-        plt.legend()
-        
-
-        plate, plate_for_loading = partial_reflux_process.calculate_theory_plate()
-        print(f"理论板数: {plate}\n加料板: {plate_for_loading}")
-
-        if(True):
-            for i in range(len(partial_reflux_process.x_list) - 1):
-                i_plus_one = i + 1
-                plt.axhline(y=partial_reflux_process.y_list[i], xmin=partial_reflux_process.x_list[i_plus_one], 
-                            xmax=partial_reflux_process.x_list[i], color="black")
-                plt.axvline(x=partial_reflux_process.x_list[i_plus_one], ymin=partial_reflux_process.y_list[i_plus_one], 
-                            ymax=partial_reflux_process.y_list[i], color="black")
-                
-        plt.show()
+        self.timer = profiling.PhaseTimer(self.profile)
+        with self.timer.phase("parse"):
+            alpha = eval(self.lineEdit_alpha.text())
+            ratio = eval(self.lineEdit_ratio.text())
+            q = eval(self.lineEdit_q.text())
+            z_F = eval(self.lineEdit_z_F.text())
+            x_D = eval(self.lineEdit_x_D.text())
+            x_W = eval(self.lineEdit_x_W.text())
+        with self.timer.phase("build"):
+            partial_reflux_process = partial_reflux.PartialReflux(alpha, q, ratio, z_F, x_D, x_W)
 
-        # 在程序中显示结果
-        current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
-        plain_content = (f"======== {current_time} 部分回流结果========\n" 
-                        f"最优加料板: {plate_for_loading}\n" 
-                        f"理论板数: {round(plate, 2)}")
-        self.textBrowser_output.append(plain_content)
+        self.start_calculation(partial_reflux_process, self.show_partial_reflux_result)
 
 
     def draw_diagram_for_full_reflux(self):
@@ -283,44 +387,15 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             )
             return
         
-        alpha = eval(self.lineEdit_alpha.text())
-        x_D = eval(self.lineEdit_x_D.text())
-        x_W = eval(self.lineEdit_x_W.text())
-        full_reflux_process = full_reflux.FullReflux(alpha, x_D, x_W)
-
-        x_for_global = np.linspace(0, 1, 50)
-
-        matplotlib.rcParams['font.family']='Microsoft YaHei'
-        matplotlib.rcParams['axes.unicode_minus']=False
-        plt.figure(figsize=(8, 8))
-        plt.title("精馏塔理论板图(全回流)")
-        plt.xlabel('x')
-        plt.ylabel('y')
-        plt.xlim(0, 1)
-        plt.ylim(0, 1)
-
-        plt.plot(x_for_global, x_for_global, label="y = x")
-        plt.plot(x_for_global, full_reflux_process.equilibrium_line(x_for_global), label="平衡线")
-        plt.legend()
-
-        plate = full_reflux_process.calculate_theory_plate()
-        print(f"理论板数: {plate}")
+        self.timer = profiling.PhaseTimer(self.profile)
+        with self.timer.phase("parse"):
+            alpha = eval(self.lineEdit_alpha.text())
+            x_D = eval(self.lineEdit_x_D.text())
+            x_W = eval(self.lineEdit_x_W.text())
+        with self.timer.phase("build"):
+            full_reflux_process = full_reflux.FullReflux(alpha, x_D, x_W)
 
-
-        for i in range(len(full_reflux_process.x_list) - 1):
-            i_plus_one = i + 1
-            plt.axhline(y=full_reflux_process.y_list[i], xmin=full_reflux_process.x_list[i_plus_one],
-                         xmax=full_reflux_process.x_list[i], color="black")
-            plt.axvline(x=full_reflux_process.x_list[i_plus_one], ymin=full_reflux_process.y_list[i_plus_one],
-                        ymax=full_reflux_process.y_list[i], color="black")
-            
-        plt.show()
-
-        # 在程序中显示结果
-        current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
-        plain_content = (f"======== {current_time} 全回流结果========\n" 
-                        f"理论板数: {round(plate, 2)}")
-        self.textBrowser_output.append(plain_content)
+        self.start_calculation(full_reflux_process, self.show_full_reflux_result)
 
 
     # 以下代码为解决非理想物系的特殊方案
@@ -336,34 +411,29 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         if not selected_file_path:
             return
 
-        if selected_file_path.lower().endswith('.csv'):
-            try:
-                df = pd.read_csv(selected_file_path)
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "导入失败",
-                    f"读取CSV文件失败:\n{str(e)}\n",
-                    QMessageBox.Ok
-                )
-                return 
-            self.import_success = self.process_dataframe(df)
-        elif selected_file_path.lower().endswith(('.xlsx', '.xls')):
-            try:
-                df = pd.read_excel(selected_file_path)
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "导入失败",
-                    f"读取Excel文件失败:\n{str(e)}\n"
-                    f"如果您多次失败，可考虑使用CSV文件，在Excel中可另存为CSV文件",
-                    QMessageBox.Ok
-                )
-                return 
-            self.import_success = self.process_dataframe(df)
-        else:
+        if not selected_file_path.lower().endswith(('.csv', '.xlsx', '.xls')):
             QMessageBox.warning(self, "不支持的文件格式", "请选择CSV或Excel文件")
             return
+
+        # 第一次读取时检查格式并缓存为二进制文件, 之后直接读取缓存
+        try:
+            self.equilibrium_x, self.equilibrium_y = vle_store.load(selected_file_path)
+            self.import_success = True
+        except ValueError:
+            self.import_success = False
+        except Exception as e:
+            if selected_file_path.lower().endswith('.csv'):
+                message = f"读取CSV文件失败:\n{str(e)}\n"
+            else:
+                message = (f"读取Excel文件失败:\n{str(e)}\n"
+                           f"如果您多次失败，可考虑使用CSV文件，在Excel中可另存为CSV文件")
+            QMessageBox.critical(
+                self,
+                "导入失败",
+                message,
+                QMessageBox.Ok
+            )
+            return 
         
         current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
         if self.import_success:
@@ -372,45 +442,18 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                         f"x: {self.equilibrium_x}\n"
                         f"y: {self.equilibrium_y}")
             self.textBrowser_output.append(plain_content)
+            fit = vle_fit.fit_alpha(self.equilibrium_x, self.equilibrium_y)
+            plain_content = (f"按恒定相对挥发度回归: α = {fit['parameters']['alpha']:.4f}, "
+                             f"y残差均方根 = {fit['rmse']:.4f}, 最大残差 = {fit['max_error']:.4f}")
+            if fit['max_error'] <= 0.01:
+                plain_content += "\n拟合良好, 可选择理想物系并输入该α以加快计算"
+            self.textBrowser_output.append(plain_content)
         else:
             plain_content = (f"======== {current_time} 文件导入失败========\n" 
                         f"请点击“文件导入须知...”以获得更多信息") 
             self.textBrowser_output.append(plain_content)
         self.update_statusBar()
 
-    def process_dataframe(self, df):
-        """处理DataFrame数据。
-        
-        会更改MainWindow中的equilibrium_x, equilibrium_x
-
-        Args:
-            df(DataFrame): pandas.DataFrame 类的实例
-
-        Returns:
-            bool: 导入是否成功 
-        """
-        try:
-            # 检查数据是否有x,y两列数据（iloc[行, 列]）, 数据中没有NaN, 第一个点为(0, 0), 最后一个点为(1, 1)
-            if (len(df.columns) == 2 and
-                (not df.isna().any().any()) and 
-                (df.iloc[0,0] == 0) and 
-                (df.iloc[0,1] == 0) and
-                (df.iloc[-1,0] == 1) and
-                (df.iloc[-1,1] == 1)):
-                self.equilibrium_x = df.iloc[:, 0].astype(float).tolist()
-                self.equilibrium_y = df.iloc[:, 1].astype(float).tolist()
-                return True
-            else:
-                return False
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "处理数据失败",
-                f"处理数据时出错:\n{str(e)}"
-            )
-            return False
-
-
     def show_import_help(self):
         self.window = Widget()
         self.window.textBrowser.setOpenExternalLinks(True)
@@ -429,58 +472,18 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             )
             return
         
-        ratio = eval(self.lineEdit_ratio.text())
-        q = eval(self.lineEdit_q.text())
-        z_F = eval(self.lineEdit_z_F.text())
-        x_D = eval(self.lineEdit_x_D.text())
-        x_W = eval(self.lineEdit_x_W.text())
-        partial_reflux_process_special = partial_reflux_non_ideal.PartialRefluxNonIdeal(self.equilibrium_x, self.equilibrium_y, 
-                                                                                        q, ratio, z_F, x_D, x_W)
-
-        x_for_global = np.linspace(0, 1, 50)
-        x_for_qline = np.linspace(min([partial_reflux_process_special.intersection[0], z_F]), 
-                                  max([partial_reflux_process_special.intersection[0], z_F]), 50)
-        x_for_rectification = np.linspace(0, x_D, 50)
-        x_for_stripping = np.linspace(x_W, partial_reflux_process_special.intersection[0], 50)
-
-        matplotlib.rcParams['font.family']='Microsoft YaHei'
-        matplotlib.rcParams['axes.unicode_minus']=False
-        plt.figure(figsize=(8, 8))
-        plt.title("精馏塔理论板图(部分回流)")
-        plt.xlabel('x')
-        plt.ylabel('y')
-        plt.xlim(0, 1)
-        plt.ylim(0, 1)
-
-        plt.plot(x_for_global, x_for_global, label="y = x")
-        plt.plot(x_for_global, partial_reflux_process_special.equilibrium_line(x_for_global), label="平衡线")
-        plt.plot(x_for_rectification, partial_reflux_process_special.operating_line_of_rectification_section(x_for_rectification),
-                                                                                      label="精馏段操作线")
-        if q != 1:
-            plt.plot(x_for_qline, partial_reflux_process_special.q_line(x_for_qline), label="q线")
-        else:
-            plt.axvline(x=z_F, ymin=z_F, ymax=partial_reflux_process_special.intersection[1], label="q线")
-        plt.plot(x_for_stripping, partial_reflux_process_special.operating_line_of_stripping_section(x_for_stripping),
-                                                                                label="提馏段操作线")
-        plt.legend()
-
-        plate, plate_for_loading = partial_reflux_process_special.calculate_theory_plate()
-        print(f"理论板数: {plate}\n加料板: {plate_for_loading}")
-
-        for i in range(len(partial_reflux_process_special.x_list) - 1):
-            i_plus_one = i + 1
-            plt.axhline(y=partial_reflux_process_special.y_list[i], xmin=float(partial_reflux_process_special.x_list[i_plus_one]), 
-                        xmax=float(partial_reflux_process_special.x_list[i]), color="black")
-            plt.axvline(x=partial_reflux_process_special.x_list[i_plus_one], ymin=float(partial_reflux_process_special.y_list[i_plus_one]), 
-                        ymax=float(partial_reflux_process_special.y_list[i]), color="black")
-        plt.show()
-
-        # 在程序中显示结果
-        current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
-        plain_content = (f"======== {current_time} 部分回流结果========\n" 
-                        f"最优加料板: {plate_for_loading}\n" 
-                        f"理论板数: {round(plate, 2)}")
-        self.textBrowser_output.append(plain_content)
+        self.timer = profiling.PhaseTimer(self.profile)
+        with self.timer.phase("parse"):
+            ratio = eval(self.lineEdit_ratio.text())
+            q = eval(self.lineEdit_q.text())
+            z_F = eval(self.lineEdit_z_F.text())
+            x_D = eval(self.lineEdit_x_D.text())
+            x_W = eval(self.lineEdit_x_W.text())
+        with self.timer.phase("build"):
+            partial_reflux_process_special = partial_reflux_non_ideal.PartialRefluxNonIdeal(self.equilibrium_x, self.equilibrium_y, 
+                                                                                            q, ratio, z_F, x_D, x_W)
+
+        self.start_calculation(partial_reflux_process_special, self.show_partial_reflux_result)
 
     def draw_diagram_for_full_reflux_special(self):
         """计算全回流(非理想)理论塔板并作图"""
@@ -494,42 +497,15 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             )
             return
         
-        x_D = eval(self.lineEdit_x_D.text())
-        x_W = eval(self.lineEdit_x_W.text())
-        full_reflux_process_special = full_reflux_non_ideal.FullRefluxNonIdeal(self.equilibrium_x, self.equilibrium_y,
-                                                                               x_D, x_W)
-        x_for_global = np.linspace(0, 1, 50)
-
-        matplotlib.rcParams['font.family']='Microsoft YaHei'
-        matplotlib.rcParams['axes.unicode_minus']=False
-        plt.figure(figsize=(8, 8))
-        plt.title("精馏塔理论板图(全回流)")
-        plt.xlabel('x')
-        plt.ylabel('y')
-        plt.xlim(0, 1)
-        plt.ylim(0, 1)
-
-        plt.plot(x_for_global, x_for_global, label="y = x")
-        plt.plot(x_for_global, full_reflux_process_special.equilibrium_line(x_for_global), label="平衡线")
-        plt.legend()
-
-        plate = full_reflux_process_special.calculate_theory_plate()
-        print(f"理论板数: {plate}")
-
-        for i in range(len(full_reflux_process_special.x_list) - 1):
-            i_plus_one = i + 1
-            plt.axhline(y=full_reflux_process_special.y_list[i], xmin=float(full_reflux_process_special.x_list[i_plus_one]),
-                         xmax=float(full_reflux_process_special.x_list[i]), color="black")
-            plt.axvline(x=full_reflux_process_special.x_list[i_plus_one], ymin=float(full_reflux_process_special.y_list[i_plus_one]),
-                        ymax=float(full_reflux_process_special.y_list[i]), color="black")
-            
-        plt.show()
-
-        # 在程序中显示结果
-        current_time = QDateTime.currentDateTime().toString("hh:mm:ss")
-        plain_content = (f"======== {current_time} 全回流结果========\n" 
-                        f"理论板数: {round(plate, 2)}")
-        self.textBrowser_output.append(plain_content)
+        self.timer = profiling.PhaseTimer(self.profile)
+        with self.timer.phase("parse"):
+            x_D = eval(self.lineEdit_x_D.text())
+            x_W = eval(self.lineEdit_x_W.text())
+        with self.timer.phase("build"):
+            full_reflux_process_special = full_reflux_non_ideal.FullRefluxNonIdeal(self.equilibrium_x, self.equilibrium_y,
+                                                                                   x_D, x_W)
+
+        self.start_calculation(full_reflux_process_special, self.show_full_reflux_result)
 
 
 class Widget(QWidget, Ui_Widget):
@@ -0,0 +1,136 @@
+import numpy as np
+
+import equilibrium_cache
+
+class MinimumReflux:
+    def __init__(self, alpha, q, z_F, x_D):
+        """
+        批量计算理想物系的最小回流比, 所有工况同时计算
+
+        参数可为标量或数组, 会按 NumPy 广播规则展开为同一形状。
+        最小回流比时精馏段操作线与平衡线相交(或相切)于恒浓区:
+        一般情况下恒浓点为q线与平衡线的交点; 平衡线有拐点时(如乙醇-水),
+        精馏段操作线可能先在q线交点上方与平衡线相切, 即切点恒浓。
+
+        Args:
+            alpha(ndarray or float): 理想状态下平衡线参数α
+            q(ndarray or float): 进料热状态
+            z_F(ndarray or float): 轻组分进料摩尔分数
+            x_D(ndarray or float): 轻组分塔顶摩尔分数
+        """
+        (self.alpha, self.q,
+         self.z_F, self.x_D) = np.broadcast_arrays(*[np.asarray(i, dtype=float)
+                                                     for i in (alpha, q, z_F, x_D)])
+
+    def equilibrium_line(self, x):
+        """平衡线, 从x计算y
+
+        Args:
+            x(ndarray): 液相平衡组成, 第0维与展平后的工况一一对应
+
+        Returns:
+            ndarray: 汽相平衡组成
+        """
+        alpha = self.alpha.reshape((-1,) + (1,) * (x.ndim - 1))
+        y = alpha * x / (1 + (alpha - 1) * x)
+        return y
+
+    def calculate_pinch_point(self, iteration=60):
+        """二分法计算q线与平衡线的交点
+
+        q线写成参数形式 (x, y) = (z_F, z_F) + t(q - 1, q), t = 0 时位于对角线上,
+        t增大时先位于平衡线下方, 越过交点后位于平衡线上方, 该形式在 q = 1 时同样成立。
+
+        Args:
+            iteration(int): 二分次数
+
+        Returns:
+            ndarray: 交点 (x, y), 形状为(2, 工况数)
+        """
+        q = self.q.ravel()
+        z_F = self.z_F.ravel()
+
+        # t的上限为q线离开 [0, 1] 方形区域的位置
+        with np.errstate(divide="ignore"):
+            t_top = np.where(q > 0, (1 - z_F) / q, np.inf)
+            t_left = np.where(q < 1, z_F / (1 - q), np.inf)
+        t_low = np.zeros(q.shape)
+        t_high = np.minimum(t_top, t_left)
+
+        for _ in range(iteration):
+            t_mid = (t_low + t_high) / 2
+            below = self.equilibrium_line(z_F + t_mid * (q - 1)) > z_F + t_mid * q
+            t_low = np.where(below, t_mid, t_low)
+            t_high = np.where(below, t_high, t_mid)
+
+        t = (t_low + t_high) / 2
+        return np.stack([z_F + t * (q - 1), z_F + t * q])
+
+    def calculate_minimum_reflux_ratio(self, grid=256):
+        """计算最小回流比
+
+        精馏段操作线过 (x_D, x_D), 其斜率 R/(R + 1) 不能小于
+        (x_D - y) / (x_D - x) 在q线交点与x_D之间平衡线上的最大值。
+        先在网格上找到最大值, 再在最大值附近的两个网格间加密一次。
+
+        Args:
+            grid(int): 每个工况的网格点数
+
+        Returns:
+            tuple: (最小回流比数组, 恒浓点x数组, 是否为切点恒浓的布尔数组),
+                   q线交点不在x_D下方(无法分离)的工况最小回流比为NaN
+        """
+        x_D = self.x_D.ravel()
+        x_pinch, _ = self.calculate_pinch_point()
+        index = np.arange(x_D.size)
+
+        def slope(x):
+            return (x_D[:, None] - self.equilibrium_line(x)) / (x_D[:, None] - x)
+
+        step = (x_D - x_pinch) / grid
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = x_pinch[:, None] + step[:, None] * np.arange(grid)
+            position = np.argmax(slope(x), axis=1)
+            x = x[index, position][:, None] + step[:, None] * np.linspace(-1, 1, grid)
+            x = np.clip(x, x_pinch[:, None], x_D[:, None] - step[:, None])
+            position = np.argmax(slope(x), axis=1)
+            x_tangent = x[index, position]
+            slope_min = slope(x_tangent[:, None])[:, 0]
+            ratio_min = slope_min / (1 - slope_min)
+
+        ratio_min[~(x_pinch < x_D)] = np.nan
+        tangent_pinch = x_tangent > x_pinch + step
+        shape = self.x_D.shape
+        return ratio_min.reshape(shape), x_tangent.reshape(shape), tangent_pinch.reshape(shape)
+
+
+class MinimumRefluxNonIdeal(MinimumReflux):
+    def __init__(self, equilibrium_x, equilibrium_y, q, z_F, x_D):
+        """
+        批量计算非理想物系的最小回流比, 所有工况共用一组相平衡数据
+
+        Args:
+            equilibrium_x (list): 液相平衡组成数据列表
+            equilibrium_y (list): 汽相平衡组成数据列表
+            q(ndarray or float): 进料热状态
+            z_F(ndarray or float): 轻组分进料摩尔分数
+            x_D(ndarray or float): 轻组分塔顶摩尔分数
+        """
+        self.equilibrium_x = np.array(equilibrium_x)
+        self.equilibrium_y = np.array(equilibrium_y)
+        super().__init__(np.nan, q, z_F, x_D)
+
+        # 检查单调性并创建 PCHIP 插值器, 同一组数据只建立一次
+        self.forward_interp, _ = equilibrium_cache.get_interpolators(self.equilibrium_x, self.equilibrium_y)
+
+    def equilibrium_line(self, x):
+        """平衡线, 从x计算y
+
+        Args:
+            x(ndarray): 液相平衡组成
+
+        Returns:
+            ndarray: 汽相平衡组成
+        """
+        y = self.forward_interp(x)
+        return y
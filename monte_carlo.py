@@ -0,0 +1,277 @@
+"""
+理论板数的蒙特卡罗不确定度分析
+α、q、R、z_F、x_D、x_W及相平衡数据都有测量误差, 按给定的分布抽样后用批量逐板计算内核
+(partial_reflux_batch, 全回流时为Fenske方程)同时计算一批样本, 统计理论板数的分位数与直方图。
+样本分块抽取和计算, 内存占用只与chunk_size有关, 与样本总数无关(只保留每个样本的塔板数与进料板)。
+
+参数可以是:
+    float: 固定值
+    tuple: (均值, 标准差)的正态分布
+    callable: f(rng, size), 返回size个样本, 例如 uniform(low, high)
+"""
+import numpy as np
+
+import full_reflux
+import partial_reflux_batch
+
+
+def normal(mean, std):
+    """正态分布
+
+    Args:
+        mean(float): 均值
+        std(float): 标准差
+
+    Returns:
+        callable: f(rng, size)
+    """
+    return lambda rng, size: rng.normal(mean, std, size)
+
+
+def uniform(low, high):
+    """均匀分布
+
+    Args:
+        low(float): 下限
+        high(float): 上限
+
+    Returns:
+        callable: f(rng, size)
+    """
+    return lambda rng, size: rng.uniform(low, high, size)
+
+
+def draw(spec, rng, size):
+    """按参数说明抽样
+
+    Args:
+        spec(float, tuple or callable): 参数说明, 见模块说明
+        rng(numpy.random.Generator): 随机数发生器
+        size(int): 样本数
+
+    Returns:
+        ndarray: 样本
+    """
+    if callable(spec):
+        return np.asarray(spec(rng, size), dtype=float)
+    if isinstance(spec, tuple):
+        return rng.normal(spec[0], spec[1], size)
+    return np.full(size, float(spec))
+
+
+def summarize(plate, plate_for_loading, invalid, percentiles=(5, 50, 95), bins=50):
+    """统计理论板数的分布
+
+    Args:
+        plate(ndarray): 各样本的塔板数, 无法分离或参数不合理时为NaN
+        plate_for_loading(ndarray): 各样本的最佳进料板, 全回流时为None
+        invalid(int): 参数不合理(组成不在(0, 1)内、x_W < z_F < x_D不成立等)的样本数
+        percentiles(tuple): 要计算的百分位数
+        bins(int): 直方图的区间数
+
+    Returns:
+        dict: samples, invalid, failed(可分离以外的样本比例), mean, std, percentiles({百分位: 塔板数}),
+            histogram((频数, 区间边界)), feed_percentiles, plate, plate_for_loading
+    """
+    finite = plate[np.isfinite(plate)]
+    result = {"samples": plate.size, "invalid": invalid, "failed": 1 - finite.size / plate.size}
+    if finite.size:
+        result["mean"] = float(finite.mean())
+        result["std"] = float(finite.std())
+        result["percentiles"] = dict(zip(percentiles, np.percentile(finite, percentiles).tolist()))
+        result["histogram"] = np.histogram(finite, bins)
+    else:
+        result["mean"] = result["std"] = np.nan
+        result["percentiles"] = dict.fromkeys(percentiles, np.nan)
+        result["histogram"] = (np.zeros(bins, dtype=int), np.full(bins + 1, np.nan))
+    if plate_for_loading is not None:
+        feed = plate_for_loading[np.isfinite(plate)]
+        result["feed_percentiles"] = dict(zip(percentiles, np.percentile(feed, percentiles).tolist()
+                                              if feed.size else [np.nan] * len(percentiles)))
+    result["plate"] = plate
+    result["plate_for_loading"] = plate_for_loading
+    return result
+
+
+class MonteCarlo:
+    def __init__(self, alpha, q, ratio, z_F, x_D, x_W, seed=None):
+        """
+        理想物系的蒙特卡罗分析, 各参数的写法见模块说明
+
+        Args:
+            alpha: 相对挥发度α
+            q: 进料热状态, 全回流时不使用
+            ratio: 实际回流比, 为None时按全回流计算
+            z_F: 轻组分进料摩尔分数, 全回流时不使用
+            x_D: 轻组分塔顶摩尔分数
+            x_W: 轻组分塔底摩尔分数
+            seed(int): 随机数种子, 相同种子、样本数与chunk_size的结果相同
+        """
+        self.alpha = alpha
+        self.q = q
+        self.ratio = ratio
+        self.z_F = z_F
+        self.x_D = x_D
+        self.x_W = x_W
+        self.rng = np.random.default_rng(seed)
+
+    def parameter_names(self):
+        """需要抽样的参数名"""
+        if self.ratio is None:
+            return ("alpha", "x_D", "x_W")
+        return ("alpha", "q", "ratio", "z_F", "x_D", "x_W")
+
+    def draw_chunk(self, size):
+        """抽取一块样本
+
+        Args:
+            size(int): 样本数
+
+        Returns:
+            dict: 各参数的样本数组, 以及valid(参数合理的样本)
+        """
+        samples = {name: draw(getattr(self, name), self.rng, size) for name in self.parameter_names()}
+        valid = (samples["x_W"] > 0) & (samples["x_D"] < 1) & (samples["x_W"] < samples["x_D"])
+        if "alpha" in samples:
+            valid &= samples["alpha"] > 1
+        if "ratio" in samples:
+            valid &= (samples["ratio"] > 0) & (samples["x_W"] < samples["z_F"]) & (samples["z_F"] < samples["x_D"])
+        samples["valid"] = valid
+        return samples
+
+    def calculate_chunk(self, samples, max_plate):
+        """计算一块参数合理的样本
+
+        Args:
+            samples(dict): draw_chunk的结果中参数合理的部分
+            max_plate(int): 每个样本允许的最大塔板数
+
+        Returns:
+            tuple: (塔板数数组, 最佳进料板数组或None)
+        """
+        if self.ratio is None:
+            process = full_reflux.FullReflux(samples["alpha"], samples["x_D"], samples["x_W"])
+            return process.calculate_theory_plate_fenske(), None
+        batch = partial_reflux_batch.PartialRefluxBatch(samples["alpha"], samples["q"], samples["ratio"],
+                                                        samples["z_F"], samples["x_D"], samples["x_W"])
+        return batch.calculate_theory_plate(max_plate)
+
+    def run(self, size=100000, chunk_size=65536, max_plate=1000, percentiles=(5, 50, 95), bins=50):
+        """抽样并统计理论板数的分布
+
+        Args:
+            size(int): 样本总数
+            chunk_size(int): 每块的样本数, 决定内存占用
+            max_plate(int): 每个样本允许的最大塔板数, 超过时视为无法分离
+            percentiles(tuple): 要计算的百分位数
+            bins(int): 直方图的区间数
+
+        Returns:
+            dict: 见summarize
+        """
+        plate = np.full(size, np.nan)
+        plate_for_loading = None if self.ratio is None else np.zeros(size, dtype=int)
+        invalid = 0
+        for start in range(0, size, chunk_size):
+            stop = min(start + chunk_size, size)
+            invalid += self.run_chunk(plate[start:stop],
+                                      None if plate_for_loading is None else plate_for_loading[start:stop],
+                                      max_plate)
+        return summarize(plate, plate_for_loading, invalid, percentiles, bins)
+
+    def run_chunk(self, plate, plate_for_loading, max_plate):
+        """抽取并计算一块样本, 结果写入plate与plate_for_loading
+
+        Args:
+            plate(ndarray): 该块的塔板数视图
+            plate_for_loading(ndarray): 该块的最佳进料板视图, 全回流时为None
+            max_plate(int): 每个样本允许的最大塔板数
+
+        Returns:
+            int: 参数不合理的样本数
+        """
+        samples = self.draw_chunk(plate.size)
+        valid = samples.pop("valid")
+        result, feed = self.calculate_chunk({name: value[valid] for name, value in samples.items()}, max_plate)
+        plate[valid] = result
+        if plate_for_loading is not None:
+            plate_for_loading[valid] = feed
+        return int(plate.size - np.count_nonzero(valid))
+
+
+class MonteCarloNonIdeal(MonteCarlo):
+    def __init__(self, equilibrium_x, equilibrium_y, q, ratio, z_F, x_D, x_W, vle_std=0.0, data_sets=100, seed=None):
+        """
+        非理想物系(部分回流)的蒙特卡罗分析
+
+        相平衡数据的误差按汽相组成加正态噪声处理: 抽取data_sets组扰动后的数据(两端的0、1不扰动,
+        扰动后不单调的一组重新抽取), 样本平均分给各组数据, 每组数据只建立一次插值器并批量计算。
+
+        Args:
+            equilibrium_x (list): 液相平衡组成数据列表
+            equilibrium_y (list): 汽相平衡组成数据列表
+            q: 进料热状态
+            ratio: 实际回流比
+            z_F: 轻组分进料摩尔分数
+            x_D: 轻组分塔顶摩尔分数
+            x_W: 轻组分塔底摩尔分数
+            vle_std(float): 汽相组成数据的标准差, 为0时不扰动相平衡数据
+            data_sets(int): 扰动后的相平衡数据组数
+            seed(int): 随机数种子
+        """
+        if ratio is None:
+            raise ValueError("非理想物系的蒙特卡罗分析只支持部分回流")
+        self.equilibrium_x = np.array(equilibrium_x, dtype=float)
+        self.equilibrium_y = np.array(equilibrium_y, dtype=float)
+        self.vle_std = vle_std
+        self.data_sets = data_sets if vle_std > 0 else 1
+        super().__init__(np.nan, q, ratio, z_F, x_D, x_W, seed)
+        # 当前使用的相平衡数据
+        self.current_y = self.equilibrium_y
+
+    def draw_equilibrium(self, attempts=100):
+        """抽取一组扰动后的汽相组成数据
+
+        Args:
+            attempts(int): 扰动后不单调时重新抽取的次数
+
+        Returns:
+            ndarray: 汽相组成数据
+
+        Raises:
+            ValueError: 多次抽取均不单调, vle_std相对数据间隔过大
+        """
+        if self.vle_std == 0:
+            return self.equilibrium_y
+        fixed = (self.equilibrium_y <= 0) | (self.equilibrium_y >= 1)
+        for _ in range(attempts):
+            noise = self.rng.normal(0, self.vle_std, self.equilibrium_y.shape)
+            y = np.clip(np.where(fixed, self.equilibrium_y, self.equilibrium_y + noise), 0, 1)
+            if np.all(np.diff(y) > 0):
+                return y
+        raise ValueError("扰动后的相平衡数据多次不单调, 请减小相平衡数据的标准差")
+
+    def parameter_names(self):
+        return ("q", "ratio", "z_F", "x_D", "x_W")
+
+    def calculate_chunk(self, samples, max_plate):
+        batch = partial_reflux_batch.PartialRefluxNonIdealBatch(self.equilibrium_x, self.current_y, samples["q"],
+                                                                samples["ratio"], samples["z_F"], samples["x_D"],
+                                                                samples["x_W"])
+        return batch.calculate_theory_plate(max_plate)
+
+    def run(self, size=100000, chunk_size=65536, max_plate=1000, percentiles=(5, 50, 95), bins=50):
+        plate = np.full(size, np.nan)
+        plate_for_loading = np.zeros(size, dtype=int)
+        invalid = 0
+        # 样本平均分给各组相平衡数据, 每组数据内再分块
+        bounds = np.linspace(0, size, self.data_sets + 1).astype(int)
+        for low, high in zip(bounds[:-1], bounds[1:]):
+            if low == high:
+                continue
+            self.current_y = self.draw_equilibrium()
+            for start in range(low, high, chunk_size):
+                stop = min(start + chunk_size, high)
+                invalid += self.run_chunk(plate[start:stop], plate_for_loading[start:stop], max_plate)
+        self.current_y = self.equilibrium_y
+        return summarize(plate, plate_for_loading, invalid, percentiles, bins)
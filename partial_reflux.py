@@ -1,5 +1,9 @@
 import numpy as np
 
+import equilibrium_model
+import stepping
+import trajectory
+
 class PartialReflux:
     def __init__(self, alpha, q, ratio, z_F, x_D, x_W):
         self.alpha = alpha
@@ -8,11 +12,11 @@ class PartialReflux:
         self.z_F = z_F
         self.x_D = x_D
         self.x_W = x_W
+        self.model = equilibrium_model.ConstantAlpha(alpha)
         self.calculate_operating_line_of_stripping_section()
 
     def equilibrium_line(self, x):
-        y = self.alpha * x / (1 + (self.alpha - 1) * x)
-        return y
+        return self.model.equilibrium_line(x)
 
     def q_line(self, x):
         if self.q != 1:
@@ -50,41 +54,24 @@ class PartialReflux:
         return y
     
     def equilibrium_line_inverse(self, y):
-        x = (-y) / (y * self.alpha - y - self.alpha)
-        return x
+        return self.model.equilibrium_line_inverse(y)
     
-    def calculate_theory_plate(self):
-        plate = 0
-        rectification_section_flag = True
-        self.x_list = [self.x_D]
-        self.y_list = [self.x_D]
-
-        while(self.x_list[-1] > self.x_W):
-            plate += 1
-            x_temp = self.equilibrium_line_inverse(self.y_list[-1])
-            self.x_list.append(x_temp)            
-            if(self.x_list[-1] <= self.intersection[0] and rectification_section_flag):
-                rectification_section_flag = False
-                plate_for_loading = plate
-            if(rectification_section_flag):
-                y_temp = self.operating_line_of_rectification_section(self.x_list[-1]) 
-            else:
-                y_temp = self.operating_line_of_stripping_section(self.x_list[-1])
-            self.y_list.append(y_temp) 
-            
-        # 此步骤为了将最后一个点落在对角线上，注释掉下一行代码对最终结果无影响，但最后一个点会落在提馏线上。
-        self.y_list[-1] = self.x_list[-1]
-
-        plate -= (self.x_list[-1] - self.x_W) / (self.x_list[-1] - self.x_list[-2])
-        return plate, plate_for_loading
-
-        
-        
-        
-        
+    def operating_segments(self):
+        """从塔顶到塔底排列的操作线段, 精馏段在q线交点以下换为提馏段
 
+        Returns:
+            list: stepping.Segment
+        """
+        slope = float((self.intersection[1] - self.x_W) / (self.intersection[0] - self.x_W))
+        return [stepping.Segment(float(self.intersection[0]), self.ratio / (self.ratio + 1),
+                                 self.x_D / (self.ratio + 1), trajectory.RECTIFICATION),
+                stepping.Segment(-np.inf, slope, self.x_W * (1 - slope), trajectory.STRIPPING)]
 
-
-    
-
-    
+    def calculate_theory_plate(self, max_plate=10000, time_limit=None, tolerance=1e-12, callback=None,
+                               store_trajectory=True, kremser_tolerance=None):
+        plate, switch_plates, self.status, self.trajectory = stepping.step(
+            self.model, self.operating_segments(), self.x_D, self.x_W, max_plate, time_limit, tolerance, callback,
+            store_trajectory, kremser_tolerance)
+        if self.status != "converged":
+            return np.nan, 0
+        return plate, switch_plates[0] if switch_plates else 0
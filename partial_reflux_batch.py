@@ -0,0 +1,171 @@
+import numpy as np
+
+import equilibrium_cache
+
+class PartialRefluxBatch:
+    def __init__(self, alpha, q, ratio, z_F, x_D, x_W):
+        """
+        批量处理部分回流、理想物系的理论塔板, 所有工况同时逐板计算
+
+        参数可为标量或数组, 会按 NumPy 广播规则展开为同一形状。
+
+        Args:
+            alpha(ndarray or float): 理想状态下平衡线参数α
+            q(ndarray or float): 进料热状态
+            ratio(ndarray or float): 实际回流比
+            z_F(ndarray or float): 轻组分进料摩尔分数
+            x_D(ndarray or float): 轻组分塔顶摩尔分数
+            x_W(ndarray or float): 轻组分塔底摩尔分数
+        """
+        (self.alpha, self.q, self.ratio,
+         self.z_F, self.x_D, self.x_W) = np.broadcast_arrays(*[np.asarray(i, dtype=float)
+                                                              for i in (alpha, q, ratio, z_F, x_D, x_W)])
+        self.calculate_operating_line_of_stripping_section()
+
+    def equilibrium_line(self, x):
+        """平衡线, 从x计算y
+
+        Args:
+            x(ndarray): 液相平衡组成
+
+        Returns:
+            ndarray: 汽相平衡组成
+        """
+        y = self.alpha * x / (1 + (self.alpha - 1) * x)
+        return y
+
+    def equilibrium_line_inverse(self, y, index=None):
+        """平衡线, 从y计算x
+
+        Args:
+            y(ndarray): 汽相平衡组成, 形状与index选出的工况一致
+            index(ndarray): 参与计算的工况(展平后)下标, 为None时计算全部工况
+
+        Returns:
+            ndarray: 液相平衡组成
+        """
+        alpha = self.alpha if index is None else self.alpha.flat[index]
+        x = (-y) / (y * alpha - y - alpha)
+        return x
+
+    def calculate_operating_line_of_stripping_section(self):
+        """计算精馏段、q线、提馏段的交点, 建立属性
+
+        精馏段操作线与q线联立后两边同乘(q - 1)(R + 1)可得 x = (x_D(q - 1) + z_F(R + 1)) / (q + R),
+        该式在 q = 1 时同样成立, 因此无需像单个工况那样求解线性方程组。q + R = 0 时直线平行, 交点为NaN。
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = (self.x_D * (self.q - 1) + self.z_F * (self.ratio + 1)) / (self.q + self.ratio)
+        y = (self.ratio / (self.ratio + 1)) * x + (self.x_D / (self.ratio + 1))
+        self.intersection = np.stack([x, y])
+
+    def calculate_theory_plate(self, max_plate=1000):
+        """同时计算所有工况的塔板以及最佳进料位置
+
+        每一轮只对尚未到达x_W的工况逐板计算, 其余工况被掩码跳过。
+
+        Args:
+            max_plate(int): 每个工况允许的最大塔板数, 超过后该工况视为无法分离
+
+        Returns:
+            tuple: (塔板数数组, 最佳进料板数组), 无法分离的工况塔板数为NaN、进料板为0
+        """
+        # 全部展平为一维数组计算, 0维(标量)输入的比较结果是np.bool_标量, 无法通过.flat原地写回
+        shape = self.x_D.shape
+        x_I, y_I = self.intersection.reshape(2, -1)
+        ratio = self.ratio.reshape(-1)
+        x_D = self.x_D.reshape(-1)
+        x_W = self.x_W.reshape(-1)
+        slope_rectification = ratio / (ratio + 1)
+        intercept_rectification = x_D / (ratio + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope_stripping = (y_I - x_W) / (x_I - x_W)
+
+        x_prev = x_D.copy()
+        x_cur = x_D.copy()
+        y_cur = x_D.copy()
+        plate = np.zeros(x_D.shape)
+        plate_for_loading = np.zeros(x_D.shape, dtype=int)
+        rectification_section_flag = np.ones(x_D.shape, dtype=bool)
+        active = x_cur > x_W
+
+        for plate_count in range(1, max_plate + 1):
+            index = np.flatnonzero(active)
+            if index.size == 0:
+                break
+            x_temp = self.equilibrium_line_inverse(y_cur[index], index)
+            x_prev[index] = x_cur[index]
+            x_cur[index] = x_temp
+            plate[index] = plate_count
+
+            to_stripping = rectification_section_flag[index] & (x_temp <= x_I[index])
+            plate_for_loading[index[to_stripping]] = plate_count
+            rectification_section_flag[index[to_stripping]] = False
+
+            rectification = rectification_section_flag[index]
+            y_temp = np.where(rectification,
+                              slope_rectification[index] * x_temp + intercept_rectification[index],
+                              slope_stripping[index] * (x_temp - x_W[index]) + x_W[index])
+            y_cur[index] = y_temp
+            active[index] = x_temp > x_W[index]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            plate -= (x_cur - x_W) / (x_cur - x_prev)
+        plate[active] = np.nan
+        plate_for_loading[active] = 0
+        return plate.reshape(shape), plate_for_loading.reshape(shape)
+
+
+class PartialRefluxNonIdealBatch(PartialRefluxBatch):
+    def __init__(self, equilibrium_x, equilibrium_y, q, ratio, z_F, x_D, x_W, table_size=None):
+        """
+        批量处理部分回流、非理想物系的理论塔板, 所有工况共用一组相平衡数据
+
+        Args:
+            equilibrium_x (list): 液相平衡组成数据列表
+            equilibrium_y (list): 汽相平衡组成数据列表
+            q(ndarray or float): 进料热状态
+            ratio(ndarray or float): 实际回流比
+            z_F(ndarray or float): 轻组分进料摩尔分数
+            x_D(ndarray or float): 轻组分塔顶摩尔分数
+            x_W(ndarray or float): 轻组分塔底摩尔分数
+            table_size(int): 反函数查表的网格点数, 为None时直接使用PCHIP插值器
+        """
+        self.equilibrium_x = np.array(equilibrium_x)
+        self.equilibrium_y = np.array(equilibrium_y)
+        super().__init__(np.nan, q, ratio, z_F, x_D, x_W)
+
+        # 检查单调性并创建 PCHIP 插值器, 同一组数据只建立一次
+        self.forward_interp, self.inverse_interp = equilibrium_cache.get_interpolators(self.equilibrium_x,
+                                                                                        self.equilibrium_y)
+        self.table_error = None
+        if table_size is not None:
+            # 查表模式: 反函数改为在均匀网格上查表并线性插值, table_error为查表的最大误差
+            self.inverse_interp = equilibrium_cache.get_inverse_table(self.equilibrium_x, self.equilibrium_y,
+                                                                      table_size)
+            self.table_error = self.inverse_interp.error
+
+    def equilibrium_line(self, x):
+        """平衡线, 从x计算y
+
+        Args:
+            x(ndarray): 液相平衡组成
+
+        Returns:
+            ndarray: 汽相平衡组成
+        """
+        y = self.forward_interp(x)
+        return y
+
+    def equilibrium_line_inverse(self, y, index=None):
+        """平衡线, 从y计算x
+
+        Args:
+            y(ndarray): 汽相平衡组成
+            index(ndarray): 参与计算的工况下标, 所有工况共用同一平衡线, 此处不使用
+
+        Returns:
+            ndarray: 液相平衡组成
+        """
+        x = self.inverse_interp(y)
+        return x
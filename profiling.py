@@ -0,0 +1,101 @@
+"""
+分阶段计时
+把一次计算分为解析输入、建立计算对象(非理想物系在此建立插值器)、逐板计算与作图几个阶段分别计时,
+结果可以格式化为文本显示在界面中, 也可以输出为字典或JSON。
+需要更细的信息时可同时用cProfile记录各阶段内的函数调用。
+"""
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+
+PHASE_NAMES = {
+    "parse": "解析输入",
+    "build": "建立计算对象",
+    "step": "逐板计算",
+    "render": "作图",
+}
+
+
+class PhaseTimer:
+    def __init__(self, profile=False):
+        """
+        建立计时器
+
+        Args:
+            profile(bool or cProfile.Profile): 是否同时用cProfile记录各阶段内的函数调用,
+                传入Profile实例时多个计时器共用同一份记录
+        """
+        self.timings = {}
+        if isinstance(profile, cProfile.Profile):
+            self.profiler = profile
+        else:
+            self.profiler = cProfile.Profile() if profile else None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """对一个阶段计时, 同名阶段的时间累加
+
+        cProfile只记录进入该阶段的线程, 后台线程中的阶段要在该线程中进入。
+
+        Args:
+            name(str): 阶段名, 通常为PHASE_NAMES的键
+        """
+        if self.profiler is not None:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+            if self.profiler is not None:
+                self.profiler.disable()
+
+    def to_dict(self):
+        """计时结果
+
+        Returns:
+            dict: phases为各阶段的秒数, total为合计
+        """
+        return {"phases": dict(self.timings), "total": sum(self.timings.values())}
+
+    def to_json(self):
+        """计时结果的JSON字符串"""
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def report(self):
+        """计时结果的文本, 每个阶段一行
+
+        Returns:
+            str: 以毫秒为单位的各阶段耗时
+        """
+        lines = [f"{PHASE_NAMES.get(name, name)}: {seconds * 1e3:.3f} ms" for name, seconds in self.timings.items()]
+        lines.append(f"合计: {sum(self.timings.values()) * 1e3:.3f} ms")
+        return "\n".join(lines)
+
+    def profile_stats(self, limit=20, sort="cumulative"):
+        """cProfile记录的函数调用统计
+
+        Args:
+            limit(int): 显示的函数个数
+            sort(str): 排序方式, 见pstats.Stats.sort_stats
+
+        Returns:
+            str: 统计文本, 未开启cProfile时为空字符串
+        """
+        if self.profiler is None:
+            return ""
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump_profile(self, path):
+        """把cProfile记录保存为文件, 可用pstats或snakeviz等工具查看
+
+        Args:
+            path(str): 文件路径
+        """
+        if self.profiler is not None:
+            self.profiler.dump_stats(path)
@@ -0,0 +1,204 @@
+"""
+操作型计算: 已知塔板数与进料板位置, 求塔顶、塔底组成
+设计型计算由x_D, x_W求塔板数; 对已有的塔, 塔板数N、进料板N_F、回流比R、q、z_F确定后
+还须给出采出率D/F, 由全塔物料衡算 z_F = (D/F) x_D + (1 - D/F) x_W, 未知数只剩x_D:
+从(x_D, x_D)出发逐板计算N块板(第N_F块板以下用提馏段操作线), 最后一块板的液相组成应等于x_W。
+N可为小数, 与设计型计算取小数塔板的方式相同, 因此设计型计算的结果代回后得到原来的x_D。
+
+残差对x_D单调递增, x_D = z_F时为负, x_W = 0或x_D = 1时为正,
+在这个区间上用割线法与Anderson-Björck法求根。
+连续计算多个相近的工况时, 以上一个工况的解为初值, 只需几次逐板计算即可收敛。
+"""
+import math
+
+import numpy as np
+
+import stepping
+import trajectory
+
+
+def operating_segments(ratio, q, z_F, distillate_fraction, x_D):
+    """以进料量为1, 由物料衡算计算精馏段与提馏段操作线
+
+    Args:
+        ratio(float): 回流比
+        q(float): 进料热状态
+        z_F(float): 轻组分进料摩尔分数
+        distillate_fraction(float): 采出率D/F
+        x_D(float): 轻组分塔顶摩尔分数
+
+    Returns:
+        list: 精馏段与提馏段的stepping.Segment, x_low不使用
+    """
+    L = ratio * distillate_fraction
+    V = (ratio + 1) * distillate_fraction
+    L_stripping = L + q
+    V_stripping = V - (1 - q)
+    return [stepping.Segment(np.nan, L / V, distillate_fraction * x_D / V, trajectory.RECTIFICATION),
+            stepping.Segment(-np.inf, L_stripping / V_stripping, (distillate_fraction * x_D - z_F) / V_stripping,
+                             trajectory.STRIPPING)]
+
+
+class Rating:
+    def __init__(self, model, stages, feed_stage, ratio, q, z_F, distillate_fraction):
+        """
+        操作型计算
+
+        Args:
+            model: 平衡模型, 见equilibrium_model与activity_model
+            stages(float): 理论塔板数, 可为小数
+            feed_stage(int): 进料板, 该板以下用提馏段操作线
+            ratio(float): 回流比
+            q(float): 进料热状态
+            z_F(float): 轻组分进料摩尔分数
+            distillate_fraction(float): 采出率D/F
+
+        Raises:
+            ValueError: 塔板数小于1、进料板不在塔内、采出率不在(0, 1)内或提馏段汽相流量不为正
+        """
+        if not stages >= 1:
+            raise ValueError("塔板数须不小于1")
+        if not 1 <= feed_stage <= math.ceil(stages):
+            raise ValueError("进料板须在第1块板与最后一块板之间")
+        if not 0 < distillate_fraction < 1:
+            raise ValueError("采出率D/F须在0与1之间")
+        if not (ratio + 1) * distillate_fraction - (1 - q) > 0:
+            raise ValueError("提馏段汽相流量须为正, 请增大回流比或q")
+        self.model = model
+        self.stages = stages
+        self.feed_stage = int(feed_stage)
+        self.ratio = ratio
+        self.q = q
+        self.z_F = z_F
+        self.distillate_fraction = distillate_fraction
+        self.evaluations = 0
+        # x_D的有根区间: x_D = z_F时x_W = z_F; x_D增大到1或x_W降为0为止
+        self.x_D_low = z_F
+        self.x_D_high = min(1.0, z_F / distillate_fraction)
+
+    def bottom_composition(self, x_D):
+        """由全塔物料衡算计算x_W
+
+        Args:
+            x_D(float): 轻组分塔顶摩尔分数
+
+        Returns:
+            float: 轻组分塔底摩尔分数
+        """
+        return (self.z_F - self.distillate_fraction * x_D) / (1 - self.distillate_fraction)
+
+    def residual(self, x_D):
+        """逐板计算stages块板后的液相组成与x_W之差
+
+        Args:
+            x_D(float): 轻组分塔顶摩尔分数
+
+        Returns:
+            float: 残差
+        """
+        self.evaluations += 1
+        plate = math.ceil(self.stages)
+        segments = operating_segments(self.ratio, self.q, self.z_F, self.distillate_fraction, x_D)
+        x_before, x_last, _ = stepping.step_stages(self.model, segments, x_D, plate, [self.feed_stage])
+        # 小数塔板: 在最后两块板之间线性插值, 与设计型计算一致
+        x_end = x_last + (plate - self.stages) * (x_before - x_last)
+        return x_end - self.bottom_composition(x_D)
+
+    def solve(self, initial=None, tolerance=1e-12, iteration=100):
+        """求x_D与x_W
+
+        先从初值出发用割线步寻找残差异号的两点(割线步越出x_D的取值范围时改为二分),
+        再用Anderson-Björck法(改进的试位法)缩小有根区间, 收敛速度接近割线法且总在有根区间内。
+
+        Args:
+            initial(float): x_D的初值, 通常为相近工况的解, 为None时取有根区间的中点
+            tolerance(float): x_D的收敛精度
+            iteration(int): 最大逐板计算次数
+
+        Returns:
+            dict: x_D, x_W, evaluations(逐板计算次数), converged(是否收敛)
+        """
+        self.evaluations = 0
+        low, high = self.x_D_low, self.x_D_high
+        if initial is None or not low < initial < high:
+            initial = (low + high) / 2
+        x_0, f_0 = initial, self.residual(initial)
+        if f_0 == 0:
+            return self._result(x_0, True)
+        if f_0 < 0:
+            low = x_0
+        else:
+            high = x_0
+        # 第二个点向有根的一侧偏移一小步, 与初值构成割线
+        x_1 = x_0 + 1e-3 * ((high if f_0 < 0 else low) - x_0)
+        while True:
+            if self.evaluations >= iteration:
+                return self._result(x_1, False)
+            f_1 = self.residual(x_1)
+            if f_1 == 0:
+                return self._result(x_1, True)
+            if (f_1 < 0) != (f_0 < 0):
+                break
+            if f_1 < 0:
+                low = x_1
+            else:
+                high = x_1
+            x = x_1 - f_1 * (x_1 - x_0) / (f_1 - f_0) if f_1 != f_0 else np.nan
+            if not low < x < high:
+                x = (low + high) / 2
+            x_0, f_0, x_1 = x_1, f_1, x
+            if high - low < tolerance:
+                return self._result(x_1, True)
+
+        # (a, f_a)与(b, f_b)异号, b为最近一次计算的点
+        a, f_a, b, f_b = x_0, f_0, x_1, f_1
+        while abs(b - a) >= tolerance:
+            if self.evaluations >= iteration:
+                return self._result(b, False)
+            x = b - f_b * (b - a) / (f_b - f_a)
+            if not min(a, b) < x < max(a, b):
+                x = (a + b) / 2
+            f = self.residual(x)
+            if f == 0 or abs(x - b) < tolerance:
+                return self._result(x, True)
+            if (f < 0) != (f_b < 0):
+                a, f_a = b, f_b
+            else:
+                # a端连续保留时缩小其函数值, 避免试位法单侧收敛
+                m = 1 - f / f_b
+                f_a *= m if m > 0 else 0.5
+            b, f_b = x, f
+        return self._result(b, True)
+
+    def _result(self, x_D, converged):
+        return {"x_D": float(x_D), "x_W": float(self.bottom_composition(x_D)), "evaluations": self.evaluations,
+                "converged": converged}
+
+
+def rate_many(model, cases, tolerance=1e-12, iteration=100):
+    """连续计算多个工况, 以上一个工况的解为下一个工况的初值
+
+    相邻工况越接近(例如依次改变回流比), 所需的逐板计算次数越少。
+
+    Args:
+        model: 平衡模型
+        cases(iterable): 每个工况为(stages, feed_stage, ratio, q, z_F, distillate_fraction)
+        tolerance(float): x_D的收敛精度
+        iteration(int): 每个工况的最大逐板计算次数
+
+    Returns:
+        list: 各工况Rating.solve的结果, 输入不合理的工况为None
+    """
+    results = []
+    initial = None
+    for case in cases:
+        try:
+            rating = Rating(model, *case)
+        except ValueError:
+            results.append(None)
+            continue
+        result = rating.solve(initial, tolerance, iteration)
+        if result["converged"]:
+            initial = result["x_D"]
+        results.append(result)
+    return results
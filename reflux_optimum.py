@@ -0,0 +1,123 @@
+"""
+最佳回流比
+回流比增大时理论板数(设备费)减少, 塔内汽相流量(能耗)增加, 总费用在某个回流比处最小。
+在 [factor_low × R_min, factor_high × R_min] 上用Brent法(有界)求费用模型的最小值,
+每个回流比的理论板数只逐板计算一次并缓存, 搜索过程中算过的点即N-R曲线。
+N-R曲线在板数接近整数处有折点, 费用曲线可能有多个局部极小, 需要确认时可先用RefluxSweep扫描缩小区间。
+"""
+import numpy as np
+
+import partial_reflux
+import partial_reflux_non_ideal
+import reflux_sweep
+
+
+def linear_cost(stage_cost=1.0, vapor_cost=1.0):
+    """费用与理论板数、塔内汽相流量成正比的费用模型
+
+    总费用 = stage_cost × N + vapor_cost × (R + 1) × D, D为单位进料的馏出液流量
+
+    Args:
+        stage_cost(float): 每块理论板的费用(设备费)
+        vapor_cost(float): 单位汽相流量的费用(能耗)
+
+    Returns:
+        callable: cost(ratio, plate, distillate)
+    """
+    def cost(ratio, plate, distillate):
+        return stage_cost * plate + vapor_cost * (ratio + 1) * distillate
+    return cost
+
+
+class RefluxOptimum(reflux_sweep.RefluxSweep):
+    def __init__(self, *args):
+        """
+        理想物系的最佳回流比, 参数同RefluxSweep
+        """
+        super().__init__(*args)
+        # 回流比 -> (塔板数, 最佳进料板), 多次搜索共用
+        self.cache = {}
+
+    def create_process(self, ratio):
+        """建立单个回流比的逐板计算对象
+
+        Args:
+            ratio(float): 回流比
+        """
+        return partial_reflux.PartialReflux(self.alpha, self.q, ratio, self.z_F, self.x_D, self.x_W)
+
+    def evaluate(self, ratio, max_plate=10000):
+        """计算一个回流比的理论板数, 已算过的回流比直接取缓存
+
+        Args:
+            ratio(float): 回流比
+            max_plate(int): 允许的最大塔板数
+
+        Returns:
+            tuple: (塔板数, 最佳进料板), 无法分离时为(NaN, 0)
+        """
+        ratio = float(ratio)
+        if ratio not in self.cache:
+            plate, plate_for_loading = self.create_process(ratio).calculate_theory_plate(max_plate,
+                                                                                         store_trajectory=False)
+            self.cache[ratio] = (float(plate), int(plate_for_loading))
+        return self.cache[ratio]
+
+    def curve(self):
+        """已算过的N-R曲线
+
+        Returns:
+            tuple: (回流比数组, 塔板数数组, 最佳进料板数组), 按回流比排序
+        """
+        ratio = np.array(sorted(self.cache))
+        plate = np.array([self.cache[i][0] for i in ratio])
+        plate_for_loading = np.array([self.cache[i][1] for i in ratio], dtype=int)
+        return ratio, plate, plate_for_loading
+
+    def optimize(self, cost=None, factor_low=1.01, factor_high=5.0, tolerance=1e-4, max_plate=10000):
+        """求费用最小的回流比
+
+        Args:
+            cost(callable): 费用模型cost(ratio, plate, distillate), 默认为linear_cost()
+            factor_low(float): 搜索区间下限与最小回流比之比, 须大于1
+            factor_high(float): 搜索区间上限与最小回流比之比
+            tolerance(float): 回流比的收敛精度(与最小回流比之比)
+            max_plate(int): 每个回流比允许的最大塔板数, 超过时该回流比的费用视为无穷大
+
+        Returns:
+            dict: ratio, factor(R/R_min), plate, plate_for_loading, cost, ratio_min,
+                evaluations(本次逐板计算次数), curve(见curve方法)
+        """
+        # scipy只在搜索时导入
+        from scipy import optimize
+
+        if cost is None:
+            cost = linear_cost()
+        distillate = (self.z_F - self.x_W) / (self.x_D - self.x_W)
+        ratio_min = self.calculate_minimum_reflux_ratio()
+        cached = len(self.cache)
+
+        def objective(ratio):
+            plate, _ = self.evaluate(ratio, max_plate)
+            return cost(ratio, plate, distillate) if np.isfinite(plate) else np.inf
+
+        result = optimize.minimize_scalar(objective, bounds=(factor_low * ratio_min, factor_high * ratio_min),
+                                          method="bounded", options={"xatol": tolerance * ratio_min})
+        ratio = float(result.x)
+        plate, plate_for_loading = self.evaluate(ratio, max_plate)
+        return {"ratio": ratio, "factor": ratio / ratio_min, "plate": plate, "plate_for_loading": plate_for_loading,
+                "cost": float(result.fun), "ratio_min": ratio_min, "evaluations": len(self.cache) - cached,
+                "curve": self.curve()}
+
+
+class RefluxOptimumNonIdeal(reflux_sweep.RefluxSweepNonIdeal, RefluxOptimum):
+    """非理想物系的最佳回流比, 参数同RefluxSweepNonIdeal"""
+
+    def create_process(self, ratio):
+        """建立单个回流比的逐板计算对象
+
+        Args:
+            ratio(float): 回流比
+        """
+        return partial_reflux_non_ideal.PartialRefluxNonIdeal(self.equilibrium_x, self.equilibrium_y, self.q, ratio,
+                                                              self.z_F, self.x_D, self.x_W)
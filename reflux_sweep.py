@@ -0,0 +1,118 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import minimum_reflux
+import partial_reflux_batch
+
+class RefluxSweep:
+    def __init__(self, alpha, q, z_F, x_D, x_W):
+        """
+        理想物系的回流比扫描, 计算理论板数随回流比的变化曲线(N-R曲线)
+
+        Args:
+            alpha(float): 理想状态下平衡线参数α
+            q(float): 进料热状态
+            z_F(float): 轻组分进料摩尔分数
+            x_D(float): 轻组分塔顶摩尔分数
+            x_W(float): 轻组分塔底摩尔分数
+        """
+        self.alpha = alpha
+        self.q = q
+        self.z_F = z_F
+        self.x_D = x_D
+        self.x_W = x_W
+
+    def create_minimum_reflux(self):
+        """建立最小回流比计算对象"""
+        return minimum_reflux.MinimumReflux(self.alpha, self.q, self.z_F, self.x_D)
+
+    def create_batch(self, ratio):
+        """建立批量逐板计算对象
+
+        Args:
+            ratio(ndarray): 回流比数组
+        """
+        return partial_reflux_batch.PartialRefluxBatch(self.alpha, self.q, ratio, self.z_F, self.x_D, self.x_W)
+
+    def calculate_minimum_reflux_ratio(self):
+        """计算最小回流比
+
+        Returns:
+            float: 最小回流比
+        """
+        ratio_min, _, _ = self.create_minimum_reflux().calculate_minimum_reflux_ratio()
+        return float(ratio_min)
+
+    def calculate_theory_plate(self, ratio, max_plate=1000):
+        """对一组回流比批量计算理论板数
+
+        Args:
+            ratio(ndarray): 回流比数组
+            max_plate(int): 每个回流比允许的最大塔板数
+
+        Returns:
+            tuple: (塔板数数组, 最佳进料板数组)
+        """
+        return self.create_batch(ratio).calculate_theory_plate(max_plate)
+
+    def sweep(self, factor=None, processes=None, max_plate=1000):
+        """在 R = factor × R_min 的网格上计算理论板数
+
+        processes为None时在当前进程中用向量化内核一次算完;
+        否则把网格均分为processes段, 交给进程池中的各进程分别计算。
+
+        Args:
+            factor(ndarray): 回流比与最小回流比之比, 默认为1~5之间(不含1)的100个点
+            processes(int): 进程数, 为None时不使用进程池
+            max_plate(int): 每个回流比允许的最大塔板数
+
+        Returns:
+            tuple: (回流比数组, 塔板数数组, 最佳进料板数组, R/R_min数组)
+        """
+        if factor is None:
+            factor = np.linspace(1, 5, 101)[1:]
+        factor = np.asarray(factor, dtype=float)
+        ratio = factor * self.calculate_minimum_reflux_ratio()
+
+        if processes is None:
+            plate, plate_for_loading = self.calculate_theory_plate(ratio, max_plate)
+        else:
+            chunks = np.array_split(ratio, processes)
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = list(executor.map(self.calculate_theory_plate, chunks, [max_plate] * processes))
+            plate = np.concatenate([i[0] for i in results])
+            plate_for_loading = np.concatenate([i[1] for i in results])
+
+        return ratio, plate, plate_for_loading, factor
+
+
+class RefluxSweepNonIdeal(RefluxSweep):
+    def __init__(self, equilibrium_x, equilibrium_y, q, z_F, x_D, x_W):
+        """
+        非理想物系的回流比扫描, 计算理论板数随回流比的变化曲线(N-R曲线)
+
+        Args:
+            equilibrium_x (list): 液相平衡组成数据列表
+            equilibrium_y (list): 汽相平衡组成数据列表
+            q(float): 进料热状态
+            z_F(float): 轻组分进料摩尔分数
+            x_D(float): 轻组分塔顶摩尔分数
+            x_W(float): 轻组分塔底摩尔分数
+        """
+        self.equilibrium_x = equilibrium_x
+        self.equilibrium_y = equilibrium_y
+        super().__init__(np.nan, q, z_F, x_D, x_W)
+
+    def create_minimum_reflux(self):
+        """建立最小回流比计算对象"""
+        return minimum_reflux.MinimumRefluxNonIdeal(self.equilibrium_x, self.equilibrium_y,
+                                                    self.q, self.z_F, self.x_D)
+
+    def create_batch(self, ratio):
+        """建立批量逐板计算对象
+
+        Args:
+            ratio(ndarray): 回流比数组
+        """
+        return partial_reflux_batch.PartialRefluxNonIdealBatch(self.equilibrium_x, self.equilibrium_y,
+                                                               self.q, ratio, self.z_F, self.x_D, self.x_W)
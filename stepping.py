@@ -0,0 +1,156 @@
+"""
+McCabe-Thiele逐板计算核心
+全回流、部分回流及理想、非理想物系的逐板计算共用同一个循环:
+从塔顶(x_D, x_D)出发, 由平衡模型从y求x, 再由x所在塔段的操作线求下一块板的y, 直到x不大于x_W。
+
+平衡模型为equilibrium_model或activity_model中的对象, 需提供equilibrium_line_inverse,
+可选提供stripping_jump(见equilibrium_model.ConstantAlpha), 没有stripping_jump的模型总是逐板计算。
+操作线为从塔顶到塔底排列的Segment序列, 第i段用于 x > x_low 的板, x不大于x_low时换到下一段,
+各段的x_low须递减, 最后一段须过(x_W, x_W), 其x_low通常为-inf。
+换段时在预先排好的分段点上二分查找, 一块板越过多个分段点(例如进料板与侧线相邻)时也只需O(log k)。
+"""
+import bisect
+import collections
+import time
+
+import numpy as np
+
+import trajectory
+
+Segment = collections.namedtuple("Segment", ["x_low", "slope", "intercept", "section"])
+Segment.__doc__ = """一段操作线 y = slope * x + intercept, 用于液相组成大于x_low的板, section为trajectory中的塔段标记"""
+
+# 全回流时操作线即对角线, 只建立一次, 各全回流计算类共用
+DIAGONAL = (Segment(-np.inf, 1.0, 0.0, trajectory.RECTIFICATION),)
+
+
+def step(model, segments, x_D, x_W, max_plate=10000, time_limit=None, tolerance=1e-12, callback=None,
+         store_trajectory=True, kremser_tolerance=None):
+    """逐板计算理论塔板
+
+    逐板计算时若液相组成不再下降(恒浓区)、塔板数超过max_plate、耗时超过time_limit或callback返回False,
+    则停止计算, status为"pinched"、"max_plate"、"timeout"或"cancelled", 正常结束时为"converged"。
+    恒浓按相对于剩余距离x - x_W的下降量判断, 高纯度分离最后几块板组成下降很小时不会误判。
+    x_D不大于x_W时不计算, status为"infeasible"。
+    给出kremser_tolerance且平衡模型提供stripping_jump时, 在最后一段操作线上用解析解跳过多块板,
+    每次跳步最多用去剩余容差的一半; stripping_jump返回None后剩余的板只会更少, 本次计算不再尝试跳步。
+    模型没有stripping_jump时忽略kremser_tolerance。
+
+    Args:
+        model: 平衡模型
+        segments(list): 从塔顶到塔底排列的Segment
+        x_D(float): 轻组分塔顶摩尔分数
+        x_W(float): 轻组分塔底摩尔分数
+        max_plate(int): 允许的最大塔板数
+        time_limit(float): 允许的最长计算时间(秒), 为None时不限制
+        tolerance(float): 相邻两板液相组成之差小于该值与上一板到x_W距离之积时视为恒浓
+        callback(callable): 每块板计算前以已算出的塔板数调用, 返回False时停止计算
+        store_trajectory(bool): 是否保存各板组成, 为False时只计数, 不保存轨迹
+        kremser_tolerance(float): 解析跳步的塔板数容差, 为None时全部逐板计算
+
+    Returns:
+        tuple: (塔板数, 换到各段操作线的板号列表, status, Trajectory或None), 无法分离时塔板数为NaN
+    """
+    equilibrium_line_inverse = model.equilibrium_line_inverse
+    stripping_jump = None if kremser_tolerance is None else getattr(model, "stripping_jump", None)
+
+    plate = 0
+    status = "converged"
+    start_time = time.perf_counter() if time_limit is not None else 0.0
+    x_W = float(x_W)
+    x_before = x_current = y_current = float(x_D)
+    index = 0
+    last = len(segments) - 1
+    # 取负号使分段点递增, 供bisect查找
+    bounds = [-segment.x_low for segment in segments[:-1]]
+    x_low, slope, intercept, section = segments[0]
+    switch_plates = []
+    kremser_error = 0.0
+    path = trajectory.Trajectory() if store_trajectory else None
+    if path is not None:
+        path.append(x_current, y_current, section)
+    if not x_current > x_W:
+        return np.nan, switch_plates, "infeasible", path
+
+    while x_current > x_W:
+        if plate >= max_plate:
+            status = "max_plate"
+            break
+        if time_limit is not None and time.perf_counter() - start_time > time_limit:
+            status = "timeout"
+            break
+        if callback is not None and callback(plate) is False:
+            status = "cancelled"
+            break
+        plate += 1
+        x_before, x_current = x_current, float(equilibrium_line_inverse(y_current))
+        if not x_before - x_current >= tolerance * (x_before - x_W):
+            status = "pinched"
+            break
+        if x_current <= x_low:
+            new_index = bisect.bisect_right(bounds, -x_current)
+            switch_plates.extend([plate] * (new_index - index))
+            index = new_index
+            x_low, slope, intercept, section = segments[index]
+        y_current = slope * x_current + intercept
+        if path is not None:
+            path.append(x_current, y_current, section)
+        if stripping_jump is not None and index == last and x_current > x_W:
+            result = stripping_jump(slope, x_W, x_current, (kremser_tolerance - kremser_error) / 2,
+                                    max_plate - plate)
+            if result is None:
+                stripping_jump = None
+            else:
+                jump, error = result
+                kremser_error += error
+                plate += jump.size
+                x_before, x_current = float(jump[-2]), float(jump[-1])
+                y_current = slope * x_current + intercept
+                if path is not None:
+                    path.extend(jump, slope * jump + intercept, section)
+
+    if status != "converged":
+        return np.nan, switch_plates, status, path
+
+    # 把最后一个点落在对角线上, 不影响塔板数
+    if path is not None:
+        path.set_last_y(x_current)
+
+    plate -= (x_current - x_W) / (x_current - x_before)
+    return plate, switch_plates, status, path
+
+
+def step_stages(model, segments, x_D, stages, switch_plates, store_trajectory=False):
+    """按给定板数逐板计算, 第switch_plates[i]块板算出液相组成后换到第i + 1段操作线, 不使用各段的x_low
+
+    用于已知塔板数与进料板位置的操作型计算, 不判断x_W, 总是算满stages块板。
+    操作线在平衡线上方时液相组成不能再下降, 此后各板停在恒浓点, 汽相组成也不超过1(避免平衡数据外推),
+    使最后一块板的组成随x_D单调变化。
+
+    Args:
+        model: 平衡模型
+        segments(list): 从塔顶到塔底排列的Segment
+        x_D(float): 轻组分塔顶摩尔分数
+        stages(int): 塔板数
+        switch_plates(list): 各段操作线换段的板号, 递增
+        store_trajectory(bool): 是否保存各板组成
+
+    Returns:
+        tuple: (倒数第二块板液相组成, 最后一块板液相组成, Trajectory或None)
+    """
+    equilibrium_line_inverse = model.equilibrium_line_inverse
+    index = 0
+    _, slope, intercept, section = segments[0]
+    x_before = x_current = y_current = float(x_D)
+    path = trajectory.Trajectory() if store_trajectory else None
+    if path is not None:
+        path.append(x_current, y_current, section)
+    for plate in range(1, stages + 1):
+        x_before, x_current = x_current, min(float(equilibrium_line_inverse(y_current)), x_current)
+        while index < len(switch_plates) and plate >= switch_plates[index]:
+            index += 1
+            _, slope, intercept, section = segments[index]
+        y_current = min(slope * x_current + intercept, 1.0)
+        if path is not None:
+            path.append(x_current, y_current, section)
+    return x_before, x_current, path
@@ -0,0 +1,105 @@
+"""
+逐板计算轨迹
+用预分配、按需倍增的float64数组保存每块板的(x, y)与所在塔段,
+对外只提供只读视图, 避免Python列表中保存大量NumPy 0维数组。
+"""
+import numpy as np
+
+RECTIFICATION = 0
+STRIPPING = 1
+
+RECORD_DTYPE = np.dtype([("stage", np.int64), ("x", np.float64), ("y", np.float64), ("section", np.int8)])
+
+
+class Trajectory:
+    def __init__(self, capacity=64):
+        """
+        建立空轨迹
+
+        Args:
+            capacity(int): 初始容量, 存满后容量加倍
+        """
+        self.size = 0
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self._section = np.empty(capacity, dtype=np.int8)
+
+    def append(self, x, y, section=RECTIFICATION):
+        """添加一个点
+
+        Args:
+            x(float): 液相组成
+            y(float): 汽相组成
+            section(int): 所在塔段, RECTIFICATION或STRIPPING, 全回流时均为RECTIFICATION, 多股进料时为从塔顶起的塔段序号
+        """
+        if self.size == len(self._x):
+            capacity = 2 * len(self._x)
+            self._x = np.resize(self._x, capacity)
+            self._y = np.resize(self._y, capacity)
+            self._section = np.resize(self._section, capacity)
+        self._x[self.size] = x
+        self._y[self.size] = y
+        self._section[self.size] = section
+        self.size += 1
+
+    def extend(self, x, y, section=RECTIFICATION):
+        """添加多个点
+
+        Args:
+            x(ndarray): 液相组成
+            y(ndarray): 汽相组成
+            section(int): 所在塔段, 所有点相同
+        """
+        end = self.size + len(x)
+        if end > len(self._x):
+            capacity = max(2 * len(self._x), end)
+            self._x = np.resize(self._x, capacity)
+            self._y = np.resize(self._y, capacity)
+            self._section = np.resize(self._section, capacity)
+        self._x[self.size:end] = x
+        self._y[self.size:end] = y
+        self._section[self.size:end] = section
+        self.size = end
+
+    def set_last_y(self, y):
+        """修改最后一个点的汽相组成, 用于把最后一个点落在对角线上
+
+        Args:
+            y(float): 汽相组成
+        """
+        self._y[self.size - 1] = y
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def _read_only(array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def x(self):
+        """ndarray: 各点液相组成(只读), 第0个点为塔顶 (x_D, x_D)"""
+        return self._read_only(self._x[:self.size])
+
+    @property
+    def y(self):
+        """ndarray: 各点汽相组成(只读)"""
+        return self._read_only(self._y[:self.size])
+
+    @property
+    def section(self):
+        """ndarray: 各点所在塔段(只读)"""
+        return self._read_only(self._section[:self.size])
+
+    @property
+    def records(self):
+        """ndarray: 结构化数组(只读), 字段为stage, x, y, section"""
+        records = np.empty(self.size, dtype=RECORD_DTYPE)
+        records["stage"] = np.arange(self.size)
+        records["x"] = self._x[:self.size]
+        records["y"] = self._y[:self.size]
+        records["section"] = self._section[:self.size]
+        records.flags.writeable = False
+        return records
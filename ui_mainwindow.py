@@ -25,7 +25,7 @@ class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
         if not MainWindow.objectName():
             MainWindow.setObjectName(u"MainWindow")
-        MainWindow.resize(593, 493)
+        MainWindow.resize(1033, 493)
         self.actionHelp = QAction(MainWindow)
         self.actionHelp.setObjectName(u"actionHelp")
         self.actionAbout = QAction(MainWindow)
@@ -161,7 +161,7 @@ class Ui_MainWindow(object):
         self.textBrowser_output.setGeometry(QRect(10, 20, 481, 91))
         self.widget3 = QWidget(self.centralwidget)
         self.widget3.setObjectName(u"widget3")
-        self.widget3.setGeometry(QRect(301, 258, 211, 26))
+        self.widget3.setGeometry(QRect(271, 258, 241, 26))
         self.horizontalLayout_3 = QHBoxLayout(self.widget3)
         self.horizontalLayout_3.setObjectName(u"horizontalLayout_3")
         self.horizontalLayout_3.setContentsMargins(0, 0, 0, 0)
@@ -170,15 +170,24 @@ class Ui_MainWindow(object):
 
         self.horizontalLayout_3.addWidget(self.pushButton_draw)
 
+        self.pushButton_cancel = QPushButton(self.widget3)
+        self.pushButton_cancel.setObjectName(u"pushButton_cancel")
+        self.pushButton_cancel.setEnabled(False)
+
+        self.horizontalLayout_3.addWidget(self.pushButton_cancel)
+
         self.pushButton_quit = QPushButton(self.widget3)
         self.pushButton_quit.setObjectName(u"pushButton_quit")
 
         self.horizontalLayout_3.addWidget(self.pushButton_quit)
 
+        self.widget_plot = QWidget(self.centralwidget)
+        self.widget_plot.setObjectName(u"widget_plot")
+        self.widget_plot.setGeometry(QRect(560, 10, 441, 421))
         MainWindow.setCentralWidget(self.centralwidget)
         self.menubar = QMenuBar(MainWindow)
         self.menubar.setObjectName(u"menubar")
-        self.menubar.setGeometry(QRect(0, 0, 593, 33))
+        self.menubar.setGeometry(QRect(0, 0, 1033, 33))
         self.menuAbout = QMenu(self.menubar)
         self.menuAbout.setObjectName(u"menuAbout")
         MainWindow.setMenuBar(self.menubar)
@@ -218,6 +227,7 @@ class Ui_MainWindow(object):
         self.radioButton_partial.setText(QCoreApplication.translate("MainWindow", u"\u90e8\u5206\u56de\u6d41", None))
         self.groupBox_output.setTitle(QCoreApplication.translate("MainWindow", u"\u6d88\u606f\u680f", None))
         self.pushButton_draw.setText(QCoreApplication.translate("MainWindow", u"\u8ba1\u7b97\u5e76\u4f5c\u56fe", None))
+        self.pushButton_cancel.setText(QCoreApplication.translate("MainWindow", u"\u53d6\u6d88", None))
         self.pushButton_quit.setText(QCoreApplication.translate("MainWindow", u"\u9000\u51fa", None))
         self.menuAbout.setTitle(QCoreApplication.translate("MainWindow", u"\u5173\u4e8e", None))
     # retranslateUi
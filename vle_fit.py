@@ -0,0 +1,128 @@
+"""
+由相平衡数据回归模型参数
+对导入的x-y数据用最小二乘回归恒定相对挥发度α, 或在给出Antoine常数时回归van Laar, Wilson, NRTL的参数,
+并给出各数据点y的残差。α拟合足够好时可以改用理想物系的计算类, 比插值的非理想物系计算快得多。
+
+拟合只使用数据中0 < x < 1的内部点, 两端点(0, 0)与(1, 1)对任何模型都成立。
+"""
+import numpy as np
+
+import activity_model
+
+MODELS = {
+    "van_laar": (activity_model.VanLaar, ("A12", "A21"), (1.0, 1.0)),
+    "wilson": (activity_model.Wilson, ("lambda_12", "lambda_21"), (0.5, 0.5)),
+    "nrtl": (activity_model.NRTL, ("tau_12", "tau_21"), (0.5, 0.5)),
+}
+
+
+def _interior(equilibrium_x, equilibrium_y):
+    x = np.asarray(equilibrium_x, dtype=float)
+    y = np.asarray(equilibrium_y, dtype=float)
+    inside = (x > 0) & (x < 1)
+    return x[inside], y[inside]
+
+
+def _result(model, parameters, x, residuals):
+    return {"model": model,
+            "parameters": parameters,
+            "x": x,
+            "residuals": residuals,
+            "rmse": float(np.sqrt(np.mean(residuals ** 2))),
+            "max_error": float(np.max(np.abs(residuals)))}
+
+
+def fit_alpha(equilibrium_x, equilibrium_y, iteration=50, tolerance=1e-12):
+    """回归恒定相对挥发度α
+
+    以 y = αx / (1 + (α - 1)x) 的y残差平方和为目标,
+    先由线性化的 α x(1 - y) = y(1 - x) 得到初值, 再用Gauss-Newton迭代。
+
+    Args:
+        equilibrium_x (list or ndarray): 液相平衡组成数据
+        equilibrium_y (list or ndarray): 汽相平衡组成数据
+        iteration(int): 最大迭代次数
+        tolerance(float): α的收敛精度
+
+    Returns:
+        dict: model为"alpha", parameters为{"alpha": α}, residuals为各内部点的y残差(计算值 - 数据),
+            rmse与max_error为残差的均方根与最大绝对值
+    """
+    x, y = _interior(equilibrium_x, equilibrium_y)
+    a = x * (1 - y)
+    alpha = float(np.dot(a, y * (1 - x)) / np.dot(a, a))
+    for _ in range(iteration):
+        denominator = 1 + (alpha - 1) * x
+        residuals = alpha * x / denominator - y
+        # dy/dα = x(1 - x) / (1 + (α - 1)x)^2
+        jacobian = x * (1 - x) / denominator ** 2
+        step = float(np.dot(jacobian, residuals) / np.dot(jacobian, jacobian))
+        alpha -= step
+        if abs(step) < tolerance:
+            break
+    residuals = alpha * x / (1 + (alpha - 1) * x) - y
+    return _result("alpha", {"alpha": alpha}, x, residuals)
+
+
+def fit_activity(equilibrium_x, equilibrium_y, model, antoine_1, antoine_2, pressure,
+                 initial=None, nrtl_alpha=0.3):
+    """回归活度系数模型参数
+
+    Args:
+        equilibrium_x (list or ndarray): 液相平衡组成数据
+        equilibrium_y (list or ndarray): 汽相平衡组成数据
+        model(str): "van_laar", "wilson"或"nrtl"
+        antoine_1(tuple): 轻组分的Antoine常数(A, B, C)
+        antoine_2(tuple): 重组分的Antoine常数(A, B, C)
+        pressure(float): 操作压力, 单位与Antoine方程的p_sat相同
+        initial(tuple): 两个参数的初值, 为None时使用默认初值
+        nrtl_alpha(float): NRTL的非随机参数α, 不参与回归
+
+    Returns:
+        dict: 同fit_alpha, parameters为模型参数, 另有instance为建好的ActivityModel
+
+    Raises:
+        ValueError: 未知的模型
+    """
+    if model not in MODELS:
+        raise ValueError(f"未知的模型: {model}, 可选 {', '.join(MODELS)}")
+    # scipy只在回归时导入
+    from scipy import optimize
+
+    model_class, names, default = MODELS[model]
+    x, y = _interior(equilibrium_x, equilibrium_y)
+
+    def build(parameters):
+        if model == "nrtl":
+            return model_class(*parameters, nrtl_alpha, antoine_1, antoine_2, pressure)
+        return model_class(*parameters, antoine_1, antoine_2, pressure)
+
+    def residual_function(parameters):
+        return build(parameters).equilibrium_line(x) - y
+
+    # Wilson参数Λ必须为正
+    lower = 1e-6 if model == "wilson" else -np.inf
+    solution = optimize.least_squares(residual_function, default if initial is None else initial,
+                                      bounds=(lower, np.inf))
+    parameters = dict(zip(names, map(float, solution.x)))
+    if model == "nrtl":
+        parameters["alpha"] = nrtl_alpha
+    result = _result(model, parameters, x, residual_function(solution.x))
+    result["instance"] = build(solution.x)
+    return result
+
+
+def choose_alpha(equilibrium_x, equilibrium_y, max_error=0.01):
+    """判断能否用恒定α代替相平衡数据
+
+    Args:
+        equilibrium_x (list or ndarray): 液相平衡组成数据
+        equilibrium_y (list or ndarray): 汽相平衡组成数据
+        max_error(float): 允许的y最大绝对残差
+
+    Returns:
+        tuple: (alpha, fit), 拟合不满足max_error时alpha为None; fit为fit_alpha的结果
+    """
+    fit = fit_alpha(equilibrium_x, equilibrium_y)
+    alpha = fit["parameters"]["alpha"] if fit["max_error"] <= max_error else None
+    return alpha, fit
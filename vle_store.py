@@ -0,0 +1,93 @@
+"""
+相平衡数据的二进制缓存与快速读取
+第一次读取CSV/Excel文件时检查格式, 并把x-y数据保存为.npy文件,
+与记录源文件大小、修改时间的manifest.json一起放在源文件旁的.vle_cache目录中。
+之后读取同一文件时直接以内存映射方式打开.npy文件, 不再解析表格。
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+CACHE_DIR_NAME = ".vle_cache"
+MANIFEST_NAME = "manifest.json"
+
+
+def parse(path):
+    """解析表格文件并检查格式
+
+    要求与主窗口导入时相同: 有x,y两列数据, 数据中没有NaN, 第一个点为(0, 0), 最后一个点为(1, 1)
+
+    Args:
+        path(str): CSV或Excel文件路径, CSV不需要pandas, Excel需要pandas与openpyxl
+
+    Returns:
+        ndarray: 形状为(n, 2)的数组
+
+    Raises:
+        ValueError: 数据格式不符合要求
+    """
+    if path.lower().endswith(('.xlsx', '.xls')):
+        import pandas as pd
+        data = pd.read_excel(path).to_numpy(dtype=float)
+    else:
+        data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2, encoding="utf-8-sig")
+
+    if (data.ndim != 2 or data.shape[1] != 2 or len(data) < 2 or
+            np.isnan(data).any() or
+            tuple(data[0]) != (0, 0) or tuple(data[-1]) != (1, 1)):
+        raise ValueError(f"相平衡数据格式错误: {path}")
+    return np.ascontiguousarray(data)
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def load(path, use_cache=True):
+    """读取相平衡数据, 优先使用缓存
+
+    Args:
+        path(str): CSV或Excel文件路径
+        use_cache(bool): 是否读写缓存
+
+    Returns:
+        tuple: (equilibrium_x, equilibrium_y), 命中缓存时为内存映射的只读数组
+
+    Raises:
+        ValueError: 数据格式不符合要求
+    """
+    path = os.path.abspath(path)
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_DIR_NAME)
+    name = os.path.basename(path)
+    stat = os.stat(path)
+
+    if use_cache:
+        entry = _read_manifest(cache_dir).get(name)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            try:
+                data = np.load(os.path.join(cache_dir, entry["data"]), mmap_mode="r")
+                return data[:, 0], data[:, 1]
+            except (OSError, ValueError):
+                pass
+
+    data = parse(path)
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            data_name = f"{hashlib.sha1(name.encode()).hexdigest()[:16]}.npy"
+            np.save(os.path.join(cache_dir, data_name), data)
+            manifest = _read_manifest(cache_dir)
+            manifest[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                              "data": data_name, "rows": len(data)}
+            with open(os.path.join(cache_dir, MANIFEST_NAME), "w", encoding="utf-8") as file:
+                json.dump(manifest, file, ensure_ascii=False, indent=2)
+        except OSError:
+            # 源文件所在目录不可写时不缓存
+            pass
+    return data[:, 0], data[:, 1]